@@ -1,22 +1,81 @@
-from datetime import datetime
+import logging
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
-from .models import User
+from .cache import Principal, PrincipalCache, TokenUsageTracker
+from .hashing import HashingBusyError, PasswordHasher, make_password_context
+from .models import ApiToken, User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = make_password_context()
+password_hasher = PasswordHasher(pwd_context)
+principal_cache = PrincipalCache()
+token_usage = TokenUsageTracker()
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_FIELDS = ("email", "first_name", "last_name", "is_active", "is_admin")
 
 class AuthManager:
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Session,
+        hasher: Optional[PasswordHasher] = None,
+        cache: Optional[PrincipalCache] = None,
+        usage_tracker: Optional[TokenUsageTracker] = None
+    ):
         self.db = db_session
+        self.hasher = hasher or password_hasher
+        self.cache = cache or principal_cache
+        self.usage_tracker = usage_tracker or token_usage
+
+    def __enter__(self) -> "AuthManager":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the underlying session and return its connection to the pool"""
+        self.db.close()
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return self.hasher.context.verify(plain_password, hashed_password)
 
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        return self.hasher.context.hash(password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.hasher.verify(plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        return await self.hasher.hash(password)
+
+    def _apply_rehash(self, user: User, new_hash: Optional[str]) -> None:
+        """Replace a hash created with outdated cost parameters.
+
+        Best effort: on failure the old hash is kept and the login still succeeds.
+        """
+        if not new_hash:
+            return
+        user.password_hash = new_hash
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.warning("Password rehash failed for user %s", user.id, exc_info=True)
+
+    @staticmethod
+    def _to_principal(user: User, **extra) -> Principal:
+        principal = {"id": str(user.id), **extra}
+        principal.update((field, getattr(user, field)) for field in PRINCIPAL_FIELDS)
+        return principal
+
+    def _from_principal(self, principal: Principal) -> User:
+        """Attach a cached principal to the session without querying the database"""
+        user = User(id=UUID(principal["id"]), **{field: principal[field] for field in PRINCIPAL_FIELDS})
+        make_transient_to_detached(user)
+        return self.db.merge(user, load=False)
 
     def register_user(
         self, 
@@ -48,21 +107,91 @@ class AuthManager:
 
     def authenticate_user(self, email: str, password: str) -> Tuple[bool, str, Optional[User]]:
         try:
+            principal = self.cache.get_credentials(email, password)
+            if principal is not None:
+                return True, "Authentication successful", self._from_principal(principal)
+
             user = self.db.query(User).filter(User.email == email).first()
             if not user:
                 return False, "User not found", None
             if not user.is_active:
                 return False, "User account is disabled", None
-            if not self.verify_password(password, user.password_hash):
+            valid, new_hash = self.hasher.context.verify_and_update(password, user.password_hash)
+            if not valid:
                 return False, "Incorrect password", None
-            
-            # This will trigger the updated_at column update
-            self.db.commit()
-            
+
+            principal = self._to_principal(user)
+            self._apply_rehash(user, new_hash)
+            self.cache.set_credentials(email, password, principal)
+
             return True, "Authentication successful", user
         except Exception as e:
+            self.db.rollback()
             return False, f"Authentication failed: {str(e)}", None
 
+    async def authenticate_user_async(self, email: str, password: str) -> Tuple[bool, str, Optional[User]]:
+        """Same as ``authenticate_user`` with bcrypt run on the hashing pool"""
+        try:
+            principal = self.cache.get_credentials(email, password)
+            if principal is not None:
+                return True, "Authentication successful", self._from_principal(principal)
+
+            user = self.db.query(User).filter(User.email == email).first()
+            if not user:
+                return False, "User not found", None
+            if not user.is_active:
+                return False, "User account is disabled", None
+            valid, new_hash = await self.hasher.verify_and_update(password, user.password_hash)
+            if not valid:
+                return False, "Incorrect password", None
+
+            principal = self._to_principal(user)
+            self._apply_rehash(user, new_hash)
+            self.cache.set_credentials(email, password, principal)
+
+            return True, "Authentication successful", user
+        except HashingBusyError:
+            return False, "Authentication service busy, please retry", None
+        except Exception as e:
+            self.db.rollback()
+            return False, f"Authentication failed: {str(e)}", None
+
+    def authenticate_token(self, token: str) -> Tuple[bool, str, Optional[User]]:
+        """Authenticate an API token; ``last_used_at`` is written in batches"""
+        try:
+            principal = self.cache.get_token(token)
+            if principal is None:
+                api_token = self.db.query(ApiToken).filter(ApiToken.token == token).first()
+                if not api_token:
+                    return False, "Invalid API token", None
+                expires_at = api_token.expires_at
+                if expires_at and expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                if expires_at and expires_at <= datetime.now(timezone.utc):
+                    return False, "API token expired", None
+                user = self.db.query(User).filter(User.id == api_token.user_id).first()
+                if not user or not user.is_active:
+                    return False, "User account is disabled", None
+                principal = self._to_principal(user, token_id=str(api_token.id))
+                self.cache.set_token(token, principal, expires_at)
+            user = self._from_principal(principal)
+        except Exception as e:
+            self.db.rollback()
+            return False, f"Authentication failed: {str(e)}", None
+
+        self._record_token_use(UUID(principal["token_id"]))
+        return True, "Authentication successful", user
+
+    def _record_token_use(self, token_id: UUID) -> None:
+        """Queue a ``last_used_at`` update; a failed flush never rejects the token"""
+        self.usage_tracker.record(token_id)
+        if not self.usage_tracker.flush_due():
+            return
+        try:
+            self.usage_tracker.flush(self.db.get_bind())
+        except Exception:
+            logger.warning("Failed to write API token usage, will retry", exc_info=True)
+
     def update_password(self, user_id: UUID, current_password: str, new_password: str) -> Tuple[bool, str]:
         try:
             user = self.db.query(User).filter(User.id == user_id).first()
@@ -74,6 +203,7 @@ class AuthManager:
             
             user.password_hash = self.get_password_hash(new_password)
             self.db.commit()
+            self.cache.invalidate_user(user_id)
             return True, "Password updated successfully"
         except Exception as e:
             self.db.rollback()
@@ -87,6 +217,7 @@ class AuthManager:
             
             user.is_active = False
             self.db.commit()
+            self.cache.invalidate_user(user_id)
             return True, "User deactivated successfully"
         except Exception as e:
             self.db.rollback()
@@ -0,0 +1,175 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+from .models import ApiToken
+
+Principal = Dict[str, Any]
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, key: str, principal: Principal, ttl: float, index_ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(principal["id"], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for key in self._user_keys.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def _remove(self, key: str) -> None:
+        _, principal = self._entries.pop(key)
+        keys = self._user_keys.get(principal["id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[principal["id"]]
+
+class RedisCacheBackend:
+    """Redis storage shared by all workers, with a key set per user for invalidation"""
+
+    def __init__(self, client, prefix: str = "auth:principal:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Principal]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, principal: Principal, ttl: float, index_ttl: Optional[float] = None) -> None:
+        """Store an entry; the user's key set lives for ``index_ttl`` so it outlives every entry"""
+        user_key = f"{self.prefix}user:{principal['id']}"
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(principal), px=int(ttl * 1000))
+        pipe.sadd(user_key, self.prefix + key)
+        pipe.pexpire(user_key, int(max(ttl, index_ttl or ttl) * 1000))
+        pipe.execute()
+
+    def invalidate_user(self, user_id: str) -> None:
+        user_key = f"{self.prefix}user:{user_id}"
+        keys = self.client.smembers(user_key)
+        self.client.delete(user_key, *keys)
+
+class PrincipalCache:
+    """Short-lived cache of verified principals.
+
+    Entries are keyed by an HMAC of the credentials or API token, never
+    by the raw secret, and hold only the public user columns. Pass the
+    same ``secret`` to every worker sharing a Redis backend.
+    """
+
+    def __init__(self, backend=None, ttl: float = 60, secret: Optional[bytes] = None):
+        self.backend = backend or LocalCacheBackend()
+        self.ttl = ttl
+        self.secret = secret or os.urandom(32)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_redis_url(cls, redis_url: str, secret: bytes, ttl: float = 60) -> "PrincipalCache":
+        import redis
+
+        return cls(RedisCacheBackend(redis.Redis.from_url(redis_url)), ttl=ttl, secret=secret)
+
+    def _key(self, kind: str, *parts: str) -> str:
+        message = "\0".join(parts).encode()
+        return f"{kind}:{hmac.new(self.secret, message, hashlib.sha256).hexdigest()}"
+
+    def _get(self, key: str) -> Optional[Principal]:
+        principal = self.backend.get(key)
+        if principal is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return principal
+
+    def get_credentials(self, email: str, password: str) -> Optional[Principal]:
+        return self._get(self._key("password", email, password))
+
+    def set_credentials(self, email: str, password: str, principal: Principal) -> None:
+        self.backend.set(self._key("password", email, password), principal, self.ttl, self.ttl)
+
+    def get_token(self, token: str) -> Optional[Principal]:
+        return self._get(self._key("token", token))
+
+    def set_token(self, token: str, principal: Principal, expires_at: Optional[datetime] = None) -> None:
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl > 0:
+            self.backend.set(self._key("token", token), principal, ttl, self.ttl)
+
+    def invalidate_user(self, user_id) -> None:
+        self.backend.invalidate_user(str(user_id))
+
+class TokenUsageTracker:
+    """Collect API token ``last_used_at`` values and write them in batches"""
+
+    def __init__(self, flush_interval: float = 30):
+        self.flush_interval = flush_interval
+        self._pending: Dict[Any, datetime] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, token_id) -> None:
+        with self._lock:
+            self._pending[token_id] = datetime.now(timezone.utc)
+
+    def flush_due(self) -> bool:
+        return bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self, bind: Engine) -> int:
+        """Write pending timestamps with one executemany UPDATE on its own connection"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            with bind.begin() as connection:
+                connection.execute(
+                    update(ApiToken.__table__)
+                    .where(ApiToken.__table__.c.id == bindparam("token_id"))
+                    .values(last_used_at=bindparam("used_at")),
+                    [{"token_id": token_id, "used_at": used_at} for token_id, used_at in pending.items()],
+                )
+        except Exception:
+            with self._lock:
+                for token_id, used_at in pending.items():
+                    self._pending.setdefault(token_id, used_at)
+            raise
+        return len(pending)
+
+    def close(self, bind: Engine) -> int:
+        """Write whatever is still pending, e.g. on shutdown"""
+        return self.flush(bind)
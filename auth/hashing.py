@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = 12
+
+def make_password_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    """Build the bcrypt context.
+
+    Hashes created with a different cost are reported by
+    ``verify_and_update``, so changing ``rounds`` rehashes passwords on
+    their next successful login.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+class HashingBusyError(RuntimeError):
+    """Raised when too many hashing requests are already queued"""
+
+class PasswordHasher:
+    """Run password hashing on a bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so worker threads run in
+    parallel and the event loop stays free. At most
+    ``max_workers + max_queue`` requests are accepted at once; beyond
+    that ``HashingBusyError`` is raised instead of queueing without
+    limit during a login burst.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = 4, max_queue: int = 64):
+        self.context = context
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusyError("Too many password hashing requests in progress")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(self.context.verify, plain_password, hashed_password)
+        )
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a new hash if the stored one is outdated"""
+        return await asyncio.wrap_future(
+            self._submit(self.context.verify_and_update, plain_password, hashed_password)
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
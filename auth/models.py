@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -20,3 +20,17 @@ class User(Base):
 
     def __repr__(self):
         return f"<User {self.email}>"
+
+class ApiToken(Base):
+    __tablename__ = 'api_tokens'
+
+    id = Column(UUID, primary_key=True, server_default='uuid_generate_v4()')
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'))
+    token = Column(String(255), unique=True, nullable=False)
+    description = Column(Text)
+    expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default='CURRENT_TIMESTAMP')
+    last_used_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<ApiToken {self.id}>"
@@ -0,0 +1,104 @@
+"""Analyse de sécurité et de complexité des fichiers Python.
+
+Les problèmes de sécurité proviennent de bandit et la complexité
+cyclomatique de radon. Le résumé par fichier suit le format consommé par
+``app.workers.analysis_worker.merge_summaries``.
+"""
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from bandit.core import config as bandit_config
+from bandit.core import manager as bandit_manager
+from radon.complexity import cc_visit
+
+SUPPORTED_EXTENSIONS = {".py"}
+SEVERITY_PENALTIES = {"critical": 20.0, "high": 10.0, "medium": 5.0, "low": 1.0}
+MAX_COMPLEXITY = 10  # analyzers.radon.complexity.max_score de configs/analyzer_config.yaml
+COMPLEXITY_PENALTY = 2.0  # points retirés par point de complexité au-delà du seuil
+
+
+class SecurityAnalyzer:
+    """Analyseur bandit + radon, par fichier ou par lot de fichiers."""
+
+    def __init__(self, max_complexity: int = MAX_COMPLEXITY):
+        self.max_complexity = max_complexity
+        self.bandit_config = bandit_config.BanditConfig()
+
+    def analyze(self, code: str, filename: str) -> Dict[str, Any]:
+        """Analyse un code source fourni en mémoire."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            name = Path(filename).name
+            (Path(tmp_dir) / name).write_text(code, encoding="utf-8")
+            return self.analyze_paths(tmp_dir, [name])[name]
+
+    def analyze_paths(self, root: str, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Analyse des fichiers relatifs à ``root`` en une seule passe bandit.
+
+        Returns:
+            Résultat par chemin : ``{security_issues, code_quality, summary}``
+            ou ``{error}`` si le fichier n'a pas pu être analysé
+        """
+        root_path = Path(root)
+        absolute = {str(root_path / path): path for path in paths}
+
+        manager = bandit_manager.BanditManager(self.bandit_config, "file", quiet=True)
+        manager.discover_files(list(absolute))
+        manager.run_tests()
+
+        results: Dict[str, Dict[str, Any]] = {path: {"security_issues": []} for path in paths}
+        for fname, reason in manager.skipped:
+            results[absolute[fname]] = {"error": reason}
+        for issue in manager.get_issue_list():
+            result = results[absolute[issue.fname]]
+            if "error" not in result:
+                result["security_issues"].append({
+                    "severity": issue.severity,
+                    "confidence": issue.confidence,
+                    "test_id": issue.test_id,
+                    "test_name": issue.test,
+                    "line_number": issue.lineno,
+                    "message": issue.text,
+                })
+
+        for fname, path in absolute.items():
+            result = results[path]
+            if "error" in result:
+                continue
+            try:
+                code = Path(fname).read_text(encoding="utf-8", errors="replace")
+                result["code_quality"] = self._code_quality(code)
+            except Exception as e:
+                results[path] = {"error": str(e)}
+                continue
+            result["summary"] = self._calculate_summary(result)
+        return results
+
+    def _code_quality(self, code: str) -> Dict[str, Any]:
+        functions = [
+            {"name": block.name, "complexity": block.complexity, "line_number": block.lineno}
+            for block in cc_visit(code)
+        ]
+        return {
+            "complexity": float(max((f["complexity"] for f in functions), default=0)),
+            "functions": functions,
+        }
+
+    def _calculate_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        severity_counts = {severity: 0 for severity in SEVERITY_PENALTIES}
+        for issue in results["security_issues"]:
+            severity = issue["severity"].lower()
+            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+
+        penalty = sum(SEVERITY_PENALTIES.get(s, 0.0) * n for s, n in severity_counts.items())
+        penalty += COMPLEXITY_PENALTY * sum(
+            f["complexity"] - self.max_complexity
+            for f in results["code_quality"]["functions"]
+            if f["complexity"] > self.max_complexity
+        )
+        return {
+            "score": round(max(0.0, 100.0 - penalty), 2),
+            "total_issues": len(results["security_issues"]),
+            "severity_counts": severity_counts,
+        }
+
@@ -0,0 +1,155 @@
+"""Écriture en masse des résultats d'analyse dans PostgreSQL.
+
+Les résultats sont accumulés en mémoire puis envoyés par lots via
+``COPY`` (ou ``executemany`` en repli), au lieu d'un ``INSERT`` par
+résultat.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import asyncpg
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_PENDING_BATCHES = 4
+
+RESULT_COLUMNS = (
+    "analysis_id",
+    "analyzer_name",
+    "severity",
+    "file_path",
+    "line_number",
+    "column_number",
+    "message",
+    "code_snippet",
+    "rule_id",
+    "created_at",
+)
+
+INSERT_QUERY = (
+    f"INSERT INTO analysis_results ({', '.join(RESULT_COLUMNS)}) "
+    f"VALUES ({', '.join(f'${i}' for i in range(1, len(RESULT_COLUMNS) + 1))})"
+)
+
+
+class AnalysisResultsWriter:
+    """Écrit les résultats d'une analyse dans ``analysis_results`` par lots.
+
+    Chaque lot complet est envoyé en tâche de fond. Au-delà de
+    ``max_pending_batches`` lots en cours d'écriture, ``write`` attend
+    qu'un lot se termine : la mémoire reste bornée même si l'analyse
+    produit les résultats plus vite que la base ne les absorbe.
+
+    Exemple::
+
+        async with AnalysisResultsWriter(pool, analysis_id) as writer:
+            for issue in issues:
+                await writer.write(issue)
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        analysis_id: UUID,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES,
+        use_copy: bool = True,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size doit être supérieur à 0")
+        if max_pending_batches < 1:
+            raise ValueError("max_pending_batches doit être supérieur à 0")
+
+        self.pool = pool
+        self.analysis_id = analysis_id
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.rows_written = 0
+        self.batches_written = 0
+
+        self._buffer: List[Tuple[Any, ...]] = []
+        self._slots = asyncio.Semaphore(max_pending_batches)
+        self._pending: Set[asyncio.Task] = set()
+        self._error: Optional[BaseException] = None
+
+    async def __aenter__(self) -> "AnalysisResultsWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self._drain(raise_errors=False)
+
+    def to_record(self, finding: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Convertit un résultat en ligne ordonnée selon ``RESULT_COLUMNS``."""
+        return (
+            self.analysis_id,
+            finding["analyzer_name"],
+            finding["severity"],
+            finding["file_path"],
+            finding.get("line_number"),
+            finding.get("column_number"),
+            finding["message"],
+            finding.get("code_snippet"),
+            finding.get("rule_id"),
+            finding.get("created_at") or datetime.now(timezone.utc),
+        )
+
+    async def write(self, finding: Dict[str, Any]) -> None:
+        """Ajoute un résultat au tampon et envoie le lot s'il est plein."""
+        self._raise_pending_error()
+        self._buffer.append(self.to_record(finding))
+        if len(self._buffer) >= self.batch_size:
+            await self._dispatch()
+
+    async def write_many(self, findings: Iterable[Dict[str, Any]]) -> None:
+        """Ajoute plusieurs résultats au tampon."""
+        for finding in findings:
+            await self.write(finding)
+
+    async def flush(self) -> None:
+        """Envoie le tampon courant et attend la fin de tous les lots."""
+        if self._buffer:
+            await self._dispatch()
+        await self._drain(raise_errors=True)
+
+    async def close(self) -> None:
+        """Alias de ``flush`` pour un usage sans ``async with``."""
+        await self.flush()
+
+    async def _dispatch(self) -> None:
+        batch, self._buffer = self._buffer, []
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write_batch(batch))
+        self._pending.add(task)
+        task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception() and self._error is None:
+            self._error = task.exception()
+
+    async def _write_batch(self, batch: List[Tuple[Any, ...]]) -> None:
+        async with self.pool.acquire() as conn:
+            if self.use_copy:
+                await conn.copy_records_to_table(
+                    "analysis_results", records=batch, columns=RESULT_COLUMNS
+                )
+            else:
+                await conn.executemany(INSERT_QUERY, batch)
+        self.rows_written += len(batch)
+        self.batches_written += 1
+
+    async def _drain(self, raise_errors: bool) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if raise_errors:
+            self._raise_pending_error()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,626 @@
+"""Worker Celery pour l'analyse distribuée des projets.
+
+Une analyse de projet est découpée en lots de fichiers analysés en
+parallèle par les workers. Le parcours du projet se fait sur un worker
+de voie ; l'ordre de service des lots est ensuite décidé par
+``scheduler.FairScheduler`` et non par le broker : un processus unique,
+abonné à la file ``analysis.dispatch``, tient l'ordonnanceur et ne
+publie sur les files des voies que ``ANALYSIS_DISPATCH_CAPACITY`` lots
+à la fois. Chaque lot lui signale sa fin ; au dernier, les résumés par
+fichier sont agrégés dans ``analyses.result_summary``. L'avancement est
+publié dans Redis au fil des lots.
+
+L'état des analyses en cours (lots en attente, lots en vol, résultats
+collectés) est recopié dans Redis et reconstruit au redémarrage du
+worker ``analysis.dispatch``. Une analyse dont l'avancement est figé
+depuis ``SCAN_STALL_TIMEOUT`` secondes alors que des lots sont en vol
+est clôturée en échec par une tâche planifiée.
+
+Démarrage (une file par voie, cf. ``scheduler.LANE_QUEUES``) :
+    celery -A app.workers.analysis_worker worker -Q analysis.dispatch --concurrency=1 -B --loglevel=info
+    celery -A app.workers.analysis_worker worker -Q analysis.pr,analysis.manual,analysis.nightly --loglevel=info
+
+Le worker ``analysis.dispatch`` doit être unique et mono-processus ; il
+porte aussi beat (``-B``) pour les tâches planifiées. La capacité doit
+correspondre à la concurrence totale des workers des voies.
+"""
+import fnmatch
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from celery import Celery
+from celery.schedules import crontab
+from celery.result import AsyncResult
+from sqlalchemy import create_engine, text
+
+from app.analyzers.security_analyzer import SUPPORTED_EXTENSIONS, SecurityAnalyzer
+from app.workers.scheduler import LANE_QUEUES, AuditJob, FairScheduler, ScanDispatcher, WorkUnit
+
+DEFAULT_CHUNK_SIZE = 20
+PROGRESS_TTL = 7 * 24 * 3600  # secondes
+DEFAULT_IGNORE_PATTERNS = [
+    "*.pyc",
+    "__pycache__",
+    "*.egg-info",
+    ".git",
+    "node_modules",
+    "build",
+    "dist",
+]
+SEVERITIES = ("critical", "high", "medium", "low")
+PARTITION_MONTHS_AHEAD = 3
+DISPATCH_QUEUE = "analysis.dispatch"
+SCANS_KEY = "analysis:scans"
+
+# Mêmes variables d'environnement que app.core.config.Settings et docker-compose.yml
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+RABBITMQ_URL = os.getenv("RABBITMQ_URL", "amqp://localhost:5672")
+# Lots en cours sur l'ensemble des workers des voies
+DISPATCH_CAPACITY = int(os.getenv("ANALYSIS_DISPATCH_CAPACITY", "16"))
+# Délai sans avancement au-delà duquel une analyse avec des lots en vol est abandonnée
+SCAN_STALL_TIMEOUT = int(os.getenv("ANALYSIS_SCAN_STALL_TIMEOUT", "3600"))
+
+
+def database_url() -> str:
+    """Construit l'URL PostgreSQL à partir des variables ``POSTGRES_*``."""
+    return (
+        f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:"
+        f"{os.getenv('POSTGRES_PASSWORD', 'postgres')}@"
+        f"{os.getenv('POSTGRES_HOST', 'localhost')}:"
+        f"{os.getenv('POSTGRES_PORT', '5432')}/"
+        f"{os.getenv('POSTGRES_DB', 'auditronai')}"
+    )
+
+
+celery_app = Celery("auditronai", broker=RABBITMQ_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_default_queue=LANE_QUEUES["manual"],
+    beat_schedule={
+        "create-result-partitions": {
+            "task": "maintenance.create_result_partitions",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "reap-stalled-scans": {
+            "task": "analysis.reap_stalled_scans",
+            "schedule": crontab(minute="*/5"),
+            "options": {"queue": DISPATCH_QUEUE},
+        },
+    },
+)
+
+_redis_client: Optional[redis.Redis] = None
+_engine = None
+_coordinator: Optional["ScanCoordinator"] = None
+
+
+def get_redis() -> redis.Redis:
+    """Retourne le client Redis partagé."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+def get_engine():
+    """Retourne le moteur SQLAlchemy partagé."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(database_url(), pool_pre_ping=True)
+    return _engine
+
+
+def get_analyzer() -> SecurityAnalyzer:
+    """Instancie l'analyseur de sécurité utilisé pour chaque lot."""
+    return SecurityAnalyzer()
+
+
+class AnalysisProgress:
+    """Avancement d'une analyse stocké dans un hash Redis."""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    @staticmethod
+    def key(analysis_id: str) -> str:
+        return f"analysis:{analysis_id}:progress"
+
+    def start(self, analysis_id: str, total: int) -> None:
+        key = self.key(analysis_id)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={
+            "status": "running", "total": total, "done": 0, "failed": 0, "updated_at": time.time(),
+        })
+        pipe.expire(key, PROGRESS_TTL)
+        pipe.execute()
+
+    def advance(self, analysis_id: str, done: int, failed: int = 0) -> None:
+        key = self.key(analysis_id)
+        pipe = self.client.pipeline()
+        pipe.hincrby(key, "done", done)
+        if failed:
+            pipe.hincrby(key, "failed", failed)
+        pipe.hset(key, "updated_at", time.time())
+        pipe.execute()
+
+    def finish(self, analysis_id: str, status: str = "completed") -> None:
+        self.client.hset(self.key(analysis_id), "status", status)
+
+    def last_update(self, analysis_id: str) -> Optional[float]:
+        """Date (epoch) du dernier avancement, ``None`` si l'analyse est inconnue."""
+        updated_at = self.client.hget(self.key(analysis_id), "updated_at")
+        return float(updated_at) if updated_at is not None else None
+
+    def get(self, analysis_id: str) -> Dict[str, Any]:
+        """Retourne l'avancement sous la forme ``{status, total, done, failed, percent}``."""
+        data = self.client.hgetall(self.key(analysis_id))
+        if not data:
+            return {}
+        total = int(data.get("total", 0))
+        done = int(data.get("done", 0))
+        return {
+            "status": data.get("status"),
+            "total": total,
+            "done": done,
+            "failed": int(data.get("failed", 0)),
+            "percent": round(100.0 * done / total, 1) if total else 100.0,
+        }
+
+
+def is_ignored(relative_path: Path, ignore_patterns: Iterable[str]) -> bool:
+    """Indique si un chemin correspond à un motif d'exclusion."""
+    return any(
+        fnmatch.fnmatch(part, pattern)
+        for part in relative_path.parts
+        for pattern in ignore_patterns
+    )
+
+
+def collect_project_files(
+    root: str, ignore_patterns: Optional[Iterable[str]] = None
+) -> List[str]:
+    """Liste les fichiers analysables d'un projet, relatifs à ``root``."""
+    patterns = list(ignore_patterns or DEFAULT_IGNORE_PATTERNS)
+    root_path = Path(root)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        relative_dir = Path(dirpath).relative_to(root_path)
+        dirnames[:] = [d for d in dirnames if not is_ignored(relative_dir / d, patterns)]
+        for filename in filenames:
+            relative = relative_dir / filename
+            if relative.suffix in SUPPORTED_EXTENSIONS and not is_ignored(relative, patterns):
+                files.append(relative.as_posix())
+    return sorted(files)
+
+
+def merge_summaries(file_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fusionne les résumés par fichier en un résumé de projet."""
+    analyzed = [r for r in file_results if "error" not in r]
+    severity_counts = {severity: 0 for severity in SEVERITIES}
+    for result in analyzed:
+        for severity, count in result["summary"].get("severity_counts", {}).items():
+            severity_counts[severity] = severity_counts.get(severity, 0) + count
+
+    scores = [result["summary"].get("score", 100.0) for result in analyzed]
+    return {
+        "files_analyzed": len(analyzed),
+        "files_failed": len(file_results) - len(analyzed),
+        "total_issues": sum(r["summary"].get("total_issues", 0) for r in analyzed),
+        "severity_counts": severity_counts,
+        "score": round(sum(scores) / len(scores), 2) if scores else 100.0,
+        "min_score": min(scores) if scores else 100.0,
+        "files": [
+            {"file": r["file"], "score": r["summary"].get("score"),
+             "total_issues": r["summary"].get("total_issues", 0)}
+            for r in analyzed
+        ],
+        "errors": [{"file": r["file"], "error": r["error"]} for r in file_results if "error" in r],
+    }
+
+
+def save_summary(analysis_id: str, summary: Dict[str, Any], status: str) -> None:
+    """Enregistre le résumé agrégé dans la table ``analyses``."""
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE analyses SET status = :status, completed_at = CURRENT_TIMESTAMP, "
+                "result_summary = CAST(:summary AS JSONB) WHERE id = :analysis_id"
+            ),
+            {"status": status, "summary": json.dumps(summary), "analysis_id": analysis_id},
+        )
+
+
+def save_status(analysis_id: str, status: str) -> None:
+    """Clôture une analyse sans résumé, par exemple après un échec."""
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE analyses SET status = :status, completed_at = CURRENT_TIMESTAMP "
+                "WHERE id = :analysis_id"
+            ),
+            {"status": status, "analysis_id": analysis_id},
+        )
+
+
+def summary_status(summary: Dict[str, Any]) -> str:
+    """Statut final : ``completed``, ``partial`` si des fichiers ont échoué, ``failed`` s'ils ont tous échoué."""
+    if not summary["files_failed"]:
+        return "completed"
+    return "partial" if summary["files_analyzed"] else "failed"
+
+
+@celery_app.task(name="analysis.analyze_files")
+def analyze_files(analysis_id: str, root: str, paths: List[str]) -> List[Dict[str, Any]]:
+    """Analyse un lot de fichiers et retourne leurs résumés."""
+    try:
+        analyses = get_analyzer().analyze_paths(root, paths)
+    except Exception as e:
+        analyses = {path: {"error": str(e)} for path in paths}
+
+    results = []
+    for path in paths:
+        analysis = analyses.get(path, {"error": "résultat manquant"})
+        if "error" in analysis:
+            results.append({"file": path, "error": str(analysis["error"])})
+        else:
+            results.append({"file": path, "summary": analysis.get("summary", {})})
+
+    failed = sum("error" in result for result in results)
+    AnalysisProgress(get_redis()).advance(analysis_id, len(results), failed)
+    return results
+
+
+@celery_app.task(name="analysis.aggregate_results")
+def aggregate_results(chunk_results: List[List[Dict[str, Any]]], analysis_id: str) -> Dict[str, Any]:
+    """Agrège les résultats des lots et clôture l'analyse."""
+    summary = merge_summaries([result for chunk in chunk_results for result in chunk])
+    status = summary_status(summary)
+    save_summary(analysis_id, summary, status)
+    AnalysisProgress(get_redis()).finish(analysis_id, status)
+    return summary
+
+
+@celery_app.task(name="analysis.mark_failed")
+def mark_scan_failed(analysis_id: str) -> None:
+    """Clôture en échec une analyse dont un lot ou l'agrégation a levé une exception."""
+    AnalysisProgress(get_redis()).finish(analysis_id, "failed")
+    save_status(analysis_id, "failed")
+
+
+@celery_app.task(name="maintenance.create_result_partitions")
+def create_result_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Crée les partitions mensuelles de ``analysis_results`` pour les mois à venir.
+
+    Planifiée chaque jour par beat ; sans elle, les résultats des mois non
+    couverts finissent dans ``analysis_results_default``.
+    """
+    query = text(
+        "SELECT create_analysis_results_partition("
+        "(CURRENT_DATE + make_interval(months => :months))::DATE)"
+    )
+    with get_engine().begin() as conn:
+        return [
+            conn.execute(query, {"months": months}).scalar_one()
+            for months in range(months_ahead + 1)
+        ]
+
+
+class ScanStateStore:
+    """État des analyses confiées à l'ordonnanceur, recopié dans Redis.
+
+    Chaque lot est identifié par son index : les callbacks rejoués par le
+    broker (``task_acks_late``) ne sont donc comptés qu'une fois.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    @staticmethod
+    def key(analysis_id: str, part: str) -> str:
+        return f"analysis:{analysis_id}:{part}"
+
+    def _keys(self, analysis_id: str) -> List[str]:
+        return [self.key(analysis_id, part) for part in ("scan", "batches", "pending", "running", "results")]
+
+    def create(self, analysis_id: str, project_id: str, lane: str, root: str, batches: List[List[str]]) -> None:
+        pipe = self.client.pipeline()
+        pipe.hset(self.key(analysis_id, "scan"), mapping={
+            "project_id": project_id, "lane": lane, "root": root, "failed": 0,
+        })
+        pipe.hset(self.key(analysis_id, "batches"), mapping={
+            index: json.dumps(paths) for index, paths in enumerate(batches)
+        })
+        pipe.sadd(self.key(analysis_id, "pending"), *range(len(batches)))
+        for key in self._keys(analysis_id):
+            pipe.expire(key, PROGRESS_TTL)
+        pipe.sadd(SCANS_KEY, analysis_id)
+        pipe.execute()
+
+    def dispatched(self, analysis_id: str, index: int) -> None:
+        self.client.smove(self.key(analysis_id, "pending"), self.key(analysis_id, "running"), index)
+
+    def undispatched(self, analysis_id: str, index: int) -> None:
+        self.client.smove(self.key(analysis_id, "running"), self.key(analysis_id, "pending"), index)
+
+    def completed(self, analysis_id: str, index: int, chunk: List[Dict[str, Any]]) -> bool:
+        """Enregistre les résultats d'un lot ; ``False`` si sa fin était déjà comptée."""
+        self.client.hset(self.key(analysis_id, "results"), index, json.dumps(chunk))
+        return bool(self.client.srem(self.key(analysis_id, "running"), index))
+
+    def failed(self, analysis_id: str, index: int) -> bool:
+        """Marque l'analyse en échec et abandonne ses lots en attente ; ``False`` si déjà compté."""
+        pipe = self.client.pipeline()
+        pipe.hset(self.key(analysis_id, "scan"), "failed", 1)
+        pipe.delete(self.key(analysis_id, "pending"))
+        pipe.execute()
+        return bool(self.client.srem(self.key(analysis_id, "running"), index))
+
+    def results(self, analysis_id: str) -> List[List[Dict[str, Any]]]:
+        stored = self.client.hgetall(self.key(analysis_id, "results"))
+        return [json.loads(stored[index]) for index in sorted(stored, key=int)]
+
+    def delete(self, analysis_id: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(*self._keys(analysis_id))
+        pipe.srem(SCANS_KEY, analysis_id)
+        pipe.execute()
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Retourne l'état de chaque analyse en cours, pour reconstruire l'ordonnanceur."""
+        states = []
+        for analysis_id in sorted(self.client.smembers(SCANS_KEY)):
+            scan = self.client.hgetall(self.key(analysis_id, "scan"))
+            if not scan:
+                self.client.srem(SCANS_KEY, analysis_id)
+                continue
+            batches = self.client.hgetall(self.key(analysis_id, "batches"))
+            states.append({
+                "analysis_id": analysis_id,
+                "project_id": scan["project_id"],
+                "lane": scan["lane"],
+                "root": scan["root"],
+                "failed": scan.get("failed") == "1",
+                "pending": [
+                    (int(index), json.loads(batches[index]))
+                    for index in sorted(self.client.smembers(self.key(analysis_id, "pending")), key=int)
+                ],
+                "running": len(self.client.smembers(self.key(analysis_id, "running"))),
+            })
+        return states
+
+
+class ScanCoordinator:
+    """Analyses en cours côté worker ``analysis.dispatch``.
+
+    Publie les lots dans l'ordre du ``FairScheduler``, collecte leurs
+    résultats et clôture chaque analyse à la fin de son dernier lot.
+    Chaque changement d'état est d'abord écrit dans ``ScanStateStore``.
+    """
+
+    def __init__(self, capacity: int = DISPATCH_CAPACITY):
+        self.scheduler = FairScheduler()
+        self.dispatcher = ScanDispatcher(self.scheduler, self._send, capacity)
+        self.store = ScanStateStore(get_redis())
+        self.jobs: Dict[str, AuditJob] = {}
+        self.failed: set = set()
+
+    @staticmethod
+    def _units(root: str, batches: Iterable[Tuple[int, List[str]]]) -> List[WorkUnit]:
+        return [
+            WorkUnit(name=f"lot {index}", payload={"root": root, "index": index, "paths": paths})
+            for index, paths in batches
+        ]
+
+    def submit(self, analysis_id: str, project_id: str, lane: str, root: str, batches: List[List[str]]) -> bool:
+        """Confie une analyse à l'ordonnanceur ; ``False`` si elle est déjà en cours."""
+        if analysis_id in self.jobs:
+            return False
+        self.store.create(analysis_id, project_id, lane, root, batches)
+        AnalysisProgress(get_redis()).start(analysis_id, sum(len(paths) for paths in batches))
+        job = AuditJob(analysis_id, project_id, self._units(root, enumerate(batches)), lane=lane)
+        self.jobs[analysis_id] = job
+        self.scheduler.submit(job)
+        self.dispatcher.fill()
+        return True
+
+    def restore(self) -> int:
+        """Reconstruit l'ordonnanceur depuis Redis ; retourne le nombre d'analyses reprises.
+
+        Les lots en vol au moment de l'arrêt restent dans le broker et
+        signaleront leur fin normalement.
+        """
+        restored = []
+        for state in self.store.load():
+            analysis_id = state["analysis_id"]
+            if analysis_id in self.jobs:
+                continue
+            job = AuditJob(
+                analysis_id, state["project_id"], self._units(state["root"], state["pending"]), lane=state["lane"]
+            )
+            job.running = state["running"]
+            if state["failed"]:
+                self.failed.add(analysis_id)
+                self.scheduler.cancel(job)
+            self.jobs[analysis_id] = job
+            self.scheduler.submit(job)
+            self.dispatcher.in_flight += job.running
+            restored.append(job)
+        for job in restored:
+            self._close_if_done(job)
+        self.dispatcher.fill()
+        return len(restored)
+
+    def unit_done(self, analysis_id: str, index: int, chunk: List[Dict[str, Any]]) -> None:
+        job = self.jobs.get(analysis_id)
+        if job is None or not self.store.completed(analysis_id, index, chunk):
+            return
+        self.dispatcher.unit_done(job)
+        self._close_if_done(job)
+
+    def unit_failed(self, analysis_id: str, index: int) -> None:
+        """Un lot a levé une exception : les lots restants sont abandonnés."""
+        job = self.jobs.get(analysis_id)
+        if job is None or not self.store.failed(analysis_id, index):
+            return
+        self.failed.add(analysis_id)
+        self.scheduler.cancel(job)
+        self.dispatcher.unit_done(job)
+        self._close_if_done(job)
+
+    def reap_stalled(self, timeout: float = SCAN_STALL_TIMEOUT) -> List[str]:
+        """Clôture en échec les analyses dont les lots en vol n'avancent plus.
+
+        Couvre les lots perdus (worker tué sans acquittement tardif, arrêt
+        du répartiteur entre l'écriture de l'état et la publication).
+        """
+        progress = AnalysisProgress(get_redis())
+        now = time.time()
+        stalled = []
+        for analysis_id, job in list(self.jobs.items()):
+            updated_at = progress.last_update(analysis_id)
+            if job.running and (updated_at is None or now - updated_at > timeout):
+                self.failed.add(analysis_id)
+                self.dispatcher.release(job)
+                self._close_if_done(job)
+                stalled.append(analysis_id)
+        return stalled
+
+    def _close_if_done(self, job: AuditJob) -> None:
+        analysis_id = job.analysis_id
+        if not job.done or analysis_id not in self.jobs:
+            return
+        queue = LANE_QUEUES[job.lane]
+        # Publication avant suppression de l'état : un arrêt entre les deux
+        # rejoue la clôture au redémarrage plutôt que de la perdre
+        if analysis_id in self.failed:
+            mark_scan_failed.apply_async((analysis_id,), queue=queue)
+        else:
+            aggregate_results.apply_async(
+                (self.store.results(analysis_id), analysis_id),
+                queue=queue,
+                link_error=mark_scan_failed.si(analysis_id).set(queue=queue),
+            )
+        self.store.delete(analysis_id)
+        self.failed.discard(analysis_id)
+        del self.jobs[analysis_id]
+
+    def _send(self, job: AuditJob, unit: WorkUnit) -> None:
+        index = unit.payload["index"]
+        self.store.dispatched(job.analysis_id, index)
+        try:
+            analyze_files.apply_async(
+                (job.analysis_id, unit.payload["root"], unit.payload["paths"]),
+                queue=LANE_QUEUES[job.lane],
+                link=unit_done.s(job.analysis_id, index).set(queue=DISPATCH_QUEUE),
+                link_error=unit_failed.si(job.analysis_id, index).set(queue=DISPATCH_QUEUE),
+            )
+        except Exception:
+            self.store.undispatched(job.analysis_id, index)
+            raise
+
+
+def get_coordinator() -> ScanCoordinator:
+    """Retourne le coordinateur du processus ``analysis.dispatch``, repris depuis Redis."""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = ScanCoordinator()
+        _coordinator.restore()
+    return _coordinator
+
+
+@celery_app.task(name="analysis.plan_scan")
+def plan_scan(
+    analysis_id: str,
+    project_id: str,
+    root: str,
+    lane: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ignore_patterns: Optional[List[str]] = None,
+) -> int:
+    """Parcourt le projet sur un worker de voie et confie ses lots au répartiteur.
+
+    Retourne le nombre de lots.
+    """
+    files = collect_project_files(root, ignore_patterns)
+    if not files:
+        AnalysisProgress(get_redis()).start(analysis_id, 0)
+        aggregate_results.apply_async(([], analysis_id), queue=LANE_QUEUES[lane])
+        return 0
+
+    batches = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    enqueue_scan.apply_async((analysis_id, project_id, lane, root, batches), queue=DISPATCH_QUEUE)
+    return len(batches)
+
+
+@celery_app.task(name="analysis.enqueue_scan")
+def enqueue_scan(analysis_id: str, project_id: str, lane: str, root: str, batches: List[List[str]]) -> bool:
+    """Confie les lots d'une analyse à l'ordonnanceur ; ignore une analyse déjà en cours."""
+    return get_coordinator().submit(analysis_id, project_id, lane, root, batches)
+
+
+@celery_app.task(name="analysis.unit_done")
+def unit_done(chunk: List[Dict[str, Any]], analysis_id: str, index: int) -> None:
+    """Callback d'un lot terminé : enregistre ses résultats et publie les suivants."""
+    get_coordinator().unit_done(analysis_id, index, chunk)
+
+
+@celery_app.task(name="analysis.unit_failed")
+def unit_failed(analysis_id: str, index: int) -> None:
+    """Errback d'un lot en échec : abandonne l'analyse et libère sa capacité."""
+    get_coordinator().unit_failed(analysis_id, index)
+
+
+@celery_app.task(name="analysis.reap_stalled_scans")
+def reap_stalled_scans() -> List[str]:
+    """Clôture en échec les analyses bloquées ; planifiée par beat sur ``analysis.dispatch``."""
+    return get_coordinator().reap_stalled()
+
+
+def submit_project_scan(
+    analysis_id: str,
+    root: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ignore_patterns: Optional[Iterable[str]] = None,
+    lane: str = "manual",
+    project_id: Optional[str] = None,
+) -> AsyncResult:
+    """Lance l'analyse distribuée d'un projet.
+
+    Args:
+        analysis_id: Identifiant de la ligne ``analyses`` à compléter
+        root: Racine du projet, accessible depuis les workers
+        chunk_size: Nombre de fichiers par tâche
+        ignore_patterns: Motifs d'exclusion (par défaut ``DEFAULT_IGNORE_PATTERNS``)
+        lane: Voie de priorité (``pr``, ``manual`` ou ``nightly``) ; le
+            parcours et les lots sont publiés sur la file correspondante
+        project_id: Projet auquel s'applique le quota de l'ordonnanceur
+            (par défaut ``root``)
+
+    Returns:
+        Résultat asynchrone de la tâche ``plan_scan`` (nombre de lots) ;
+        l'avancement et le statut final se lisent avec ``get_scan_progress``
+    """
+    if lane not in LANE_QUEUES:
+        raise ValueError(f"Voie inconnue : {lane}")
+    args = (
+        str(analysis_id),
+        str(project_id or root),
+        root,
+        lane,
+        chunk_size,
+        list(ignore_patterns) if ignore_patterns is not None else None,
+    )
+    return plan_scan.apply_async(args, queue=LANE_QUEUES[lane])
+
+
+def get_scan_progress(analysis_id: str) -> Dict[str, Any]:
+    """Retourne l'avancement d'une analyse de projet."""
+    return AnalysisProgress(get_redis()).get(str(analysis_id))
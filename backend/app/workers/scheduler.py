@@ -0,0 +1,292 @@
+"""Ordonnancement équitable des analyses en file d'attente.
+
+Chaque analyse est découpée en unités de travail (lots de fichiers,
+tâches LLM). Les unités sont servies par files d'attente équitables
+pondérées (Start-time Fair Queuing) : un flux par couple
+(voie, projet), dont le poids dépend de la voie. Un gros scan de
+monorepo progresse donc à son rythme sans bloquer les vérifications de
+PR des autres équipes, et chaque projet est limité à un quota d'unités
+en cours d'exécution. Le quota cède lorsque aucun autre projet n'a de
+travail éligible : un worker libre n'attend jamais.
+"""
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+LANE_WEIGHTS = {
+    "pr": 8.0,       # vérifications de pull request
+    "manual": 4.0,   # analyses lancées depuis l'interface
+    "nightly": 1.0,  # scans complets planifiés
+}
+LANE_QUEUES = {lane: f"analysis.{lane}" for lane in LANE_WEIGHTS}
+DEFAULT_PROJECT_QUOTA = 4
+# Hors du dépôt (image Docker du backend), pointer la variable vers le fichier monté
+TOKEN_MANAGEMENT_CONFIG = Path(os.getenv(
+    "TOKEN_MANAGEMENT_CONFIG",
+    Path(__file__).resolve().parents[3] / "configs" / "token_management.yaml",
+))
+
+
+@dataclass(order=True)
+class WorkUnit:
+    """Unité de travail ; la plus petite ``priority`` passe en premier."""
+
+    priority: int = 0
+    name: str = field(default="", compare=False)
+    cost: float = field(default=1.0, compare=False)
+    payload: Any = field(default=None, compare=False)
+
+
+@dataclass(eq=False)
+class AuditJob:
+    """Analyse soumise à l'ordonnanceur."""
+
+    analysis_id: str
+    project_id: str
+    units: List[WorkUnit]
+    lane: str = "pr"
+    submitted_at: float = field(default_factory=time.monotonic)
+    running: int = 0
+
+    def __post_init__(self):
+        if self.lane not in LANE_WEIGHTS:
+            raise ValueError(f"Voie inconnue : {self.lane}")
+        self._queue: List[Tuple[WorkUnit, int]] = []
+        for order, unit in enumerate(self.units):
+            heapq.heappush(self._queue, (unit, order))
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    @property
+    def done(self) -> bool:
+        return not self._queue and self.running == 0
+
+    def pop_unit(self) -> WorkUnit:
+        return heapq.heappop(self._queue)[0]
+
+
+def load_llm_task_priorities(config_path: Path = TOKEN_MANAGEMENT_CONFIG) -> Dict[str, int]:
+    """Lit la priorité des tâches ``analysis_tasks`` de token_management.yaml."""
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    tasks = config["token_management"]["analysis_tasks"]
+    return {task["name"]: int(task.get("priority", 0)) for task in tasks}
+
+
+def llm_units(
+    tasks: Iterable[Tuple[str, Any]],
+    priorities: Dict[str, int],
+    tokens_per_unit: int = 1000,
+) -> List[WorkUnit]:
+    """Construit les unités LLM d'une analyse, ordonnées par priorité de tâche.
+
+    Args:
+        tasks: Couples (nom de tâche, charge utile), ex. ``("security_analysis", chunk)``
+        priorities: Priorités issues de ``load_llm_task_priorities``
+        tokens_per_unit: Tokens équivalant à une unité de coût, si la charge
+            utile précise ``max_tokens``
+    """
+    fallback = max(priorities.values(), default=0) + 1
+    units = []
+    for name, payload in tasks:
+        tokens = payload.get("max_tokens", tokens_per_unit) if isinstance(payload, dict) else tokens_per_unit
+        units.append(WorkUnit(
+            priority=priorities.get(name, fallback),
+            name=name,
+            cost=tokens / tokens_per_unit,
+            payload=payload,
+        ))
+    return units
+
+
+class _Flow:
+    def __init__(self, lane: str, project_id: str, weight: float, seq: int):
+        self.lane = lane
+        self.project_id = project_id
+        self.weight = weight
+        self.seq = seq
+        self.jobs: Deque[AuditJob] = deque()
+        self.last_finish = 0.0
+
+
+class FairScheduler:
+    """Ordonnanceur à files équitables pondérées avec quotas par projet.
+
+    Exemple::
+
+        scheduler = FairScheduler()
+        scheduler.submit(AuditJob("a1", "monorepo", units, lane="nightly"))
+        job, unit = scheduler.next_unit()
+        ...
+        scheduler.complete(job)
+    """
+
+    def __init__(
+        self,
+        lane_weights: Optional[Dict[str, float]] = None,
+        project_quota: int = DEFAULT_PROJECT_QUOTA,
+        project_weights: Optional[Dict[str, float]] = None,
+        work_conserving: bool = True,
+    ):
+        self.lane_weights = dict(lane_weights or LANE_WEIGHTS)
+        self.project_quota = project_quota
+        self.work_conserving = work_conserving
+        self.project_weights = project_weights or {}
+        self.virtual_time = 0.0
+        self._flows: Dict[Tuple[str, str], _Flow] = {}
+        self._running: Dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def submit(self, job: AuditJob) -> None:
+        """Ajoute une analyse à la file de son flux (voie, projet).
+
+        Les unités déjà en cours (``job.running``, analyse reprise après un
+        redémarrage) comptent dans le quota du projet.
+        """
+        key = (job.lane, job.project_id)
+        flow = self._flows.get(key)
+        if flow is None:
+            weight = self.lane_weights[job.lane] * self.project_weights.get(job.project_id, 1.0)
+            flow = self._flows[key] = _Flow(job.lane, job.project_id, weight, next(self._seq))
+        if job.running:
+            self._running[job.project_id] = self.running(job.project_id) + job.running
+        if job.pending:
+            flow.jobs.append(job)
+
+    def pending(self) -> int:
+        """Nombre d'unités en attente, toutes analyses confondues."""
+        return sum(job.pending for flow in self._flows.values() for job in flow.jobs)
+
+    def running(self, project_id: str) -> int:
+        return self._running.get(project_id, 0)
+
+    def _pick(self, respect_quota: bool) -> Tuple[Optional[_Flow], Optional[Tuple[float, int]]]:
+        best = None
+        best_tag = None
+        for flow in self._flows.values():
+            if not flow.jobs:
+                continue
+            if respect_quota and self.running(flow.project_id) >= self.project_quota:
+                continue
+            tag = (max(self.virtual_time, flow.last_finish), flow.seq)
+            if best_tag is None or tag < best_tag:
+                best, best_tag = flow, tag
+        return best, best_tag
+
+    def next_unit(self) -> Optional[Tuple[AuditJob, WorkUnit]]:
+        """Retourne la prochaine unité à exécuter, ou ``None`` si rien n'est éligible.
+
+        Les projets sous quota passent en premier ; si aucun n'a de travail
+        et que l'ordonnanceur conserve le travail, un projet au quota
+        emprunte la capacité restée libre.
+        """
+        best, best_tag = self._pick(respect_quota=True)
+        if best is None and self.work_conserving:
+            best, best_tag = self._pick(respect_quota=False)
+        if best is None:
+            return None
+
+        job = best.jobs[0]
+        unit = job.pop_unit()
+        if not job.pending:
+            best.jobs.popleft()
+
+        start = best_tag[0]
+        self.virtual_time = start
+        best.last_finish = start + unit.cost / best.weight
+        job.running += 1
+        self._running[job.project_id] = self.running(job.project_id) + 1
+        return job, unit
+
+    def complete(self, job: AuditJob) -> None:
+        """Signale la fin d'une unité et libère le quota du projet."""
+        job.running -= 1
+        self._running[job.project_id] -= 1
+
+    def requeue(self, job: AuditJob, unit: WorkUnit) -> None:
+        """Remet en tête de son analyse une unité qui n'a pas pu être publiée."""
+        self.complete(job)
+        heapq.heappush(job._queue, (unit, -1))
+        flow = self._flows[(job.lane, job.project_id)]
+        if not any(queued is job for queued in flow.jobs):
+            flow.jobs.appendleft(job)
+
+    def cancel(self, job: AuditJob) -> int:
+        """Retire les unités encore en attente d'une analyse ; retourne leur nombre."""
+        flow = self._flows.get((job.lane, job.project_id))
+        if flow is not None:
+            flow.jobs = deque(queued for queued in flow.jobs if queued is not job)
+        dropped = job.pending
+        job._queue.clear()
+        return dropped
+
+
+class ScanDispatcher:
+    """Alimente les workers à partir de l'ordonnanceur.
+
+    ``send(job, unit)`` publie une unité (ex. ``analyze_files.apply_async``
+    sur la file de la voie) ; ``capacity`` borne le nombre d'unités en vol
+    afin que l'ordre de service reste décidé ici et non par le broker.
+
+    ``unit_done`` peut être appelé pendant ``send`` (exécution eager) : il
+    ne republie pas lui-même, la boucle de ``fill`` en cours s'en charge.
+    """
+
+    def __init__(self, scheduler: FairScheduler, send: Callable[[AuditJob, WorkUnit], None], capacity: int):
+        self.scheduler = scheduler
+        self.send = send
+        self.capacity = capacity
+        self.in_flight = 0
+        self._filling = False
+
+    def fill(self) -> int:
+        """Publie des unités jusqu'à saturer la capacité ; retourne le nombre publié."""
+        if self._filling:
+            return 0
+        self._filling = True
+        sent = 0
+        try:
+            while self.in_flight < self.capacity:
+                scheduled = self.scheduler.next_unit()
+                if scheduled is None:
+                    break
+                self.in_flight += 1
+                try:
+                    self.send(*scheduled)
+                except Exception:
+                    self.in_flight -= 1
+                    self.scheduler.requeue(*scheduled)
+                    raise
+                sent += 1
+        finally:
+            self._filling = False
+        return sent
+
+    def unit_done(self, job: AuditJob) -> int:
+        """Enregistre la fin d'une unité et republie ; retourne le nombre publié."""
+        self.scheduler.complete(job)
+        self.in_flight -= 1
+        return self.fill()
+
+    def release(self, job: AuditJob) -> int:
+        """Abandonne une analyse : retire ses unités en attente et libère la
+        capacité de ses unités en vol, dont la fin ne sera plus attendue.
+
+        Retourne le nombre d'unités retirées.
+        """
+        dropped = self.scheduler.cancel(job)
+        running = job.running
+        for _ in range(running):
+            self.scheduler.complete(job)
+        self.in_flight -= running
+        self.fill()
+        return dropped
@@ -158,9 +158,12 @@ mkdir -p logs reports tmp uploads
 # Démarrage de Celery
 echo "Démarrage de Celery..."
 if [ "$IS_WINDOWS" = true ]; then
-    start /B poetry run celery -A app.workers.analysis_worker worker --loglevel=info --pool=solo
+    start /B poetry run celery -A app.workers.analysis_worker worker -Q analysis.dispatch -n dispatch@%h --loglevel=info --pool=solo
+    start /B poetry run celery -A app.workers.analysis_worker worker -Q analysis.pr,analysis.manual,analysis.nightly -n lanes@%h --loglevel=info --pool=solo
+    start /B poetry run celery -A app.workers.analysis_worker beat --loglevel=info
 else
-    poetry run celery -A app.workers.analysis_worker worker --loglevel=info &
+    poetry run celery -A app.workers.analysis_worker worker -Q analysis.dispatch -n dispatch@%h --concurrency=1 -B --loglevel=info &
+    poetry run celery -A app.workers.analysis_worker worker -Q analysis.pr,analysis.manual,analysis.nightly -n lanes@%h --concurrency="${ANALYSIS_DISPATCH_CAPACITY:-16}" --loglevel=info &
 fi
 
 # Démarrage de l'application
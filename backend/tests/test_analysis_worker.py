@@ -0,0 +1,334 @@
+"""Tests pour l'analyse distribuée des projets (Celery en mode eager)."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.workers import analysis_worker
+from app.workers.analysis_worker import (
+    AnalysisProgress,
+    ScanCoordinator,
+    celery_app,
+    collect_project_files,
+    create_result_partitions,
+    get_scan_progress,
+    merge_summaries,
+    submit_project_scan,
+)
+
+
+class FakeRedis:
+    """Substitut minimal de Redis pour les hash et ensembles utilisés par le worker."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        data = self.hashes.setdefault(key, {})
+        if mapping:
+            data.update({str(k): str(v) for k, v in mapping.items()})
+        if field is not None:
+            data[str(field)] = str(value)
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = str(int(data.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.sets.pop(key, None)
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(m) for m in members)
+
+    def srem(self, key, member):
+        members = self.sets.get(key, set())
+        removed = str(member) in members
+        members.discard(str(member))
+        return int(removed)
+
+    def smove(self, source, destination, member):
+        if self.srem(source, member):
+            self.sadd(destination, member)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Projet contenant des fichiers analysables et ignorés."""
+    (tmp_path / "src").mkdir()
+    for i in range(5):
+        (tmp_path / "src" / f"module_{i}.py").write_text("eval(x)\n" * (i % 2))
+    (tmp_path / "src" / "broken.py").write_text("syntax error")
+    (tmp_path / "queries.sql").write_text("SELECT 1;")
+    (tmp_path / "README.md").write_text("# doc")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.js").write_text("eval(x)")
+    (tmp_path / "src" / "__pycache__").mkdir()
+    (tmp_path / "src" / "__pycache__" / "module_0.cpython-311.pyc").write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """Worker en mode eager avec Redis et base simulés."""
+    fake_redis = FakeRedis()
+    saved = {}
+    monkeypatch.setattr(analysis_worker, "get_redis", lambda: fake_redis)
+    monkeypatch.setattr(analysis_worker, "_coordinator", None)
+    monkeypatch.setattr(
+        analysis_worker,
+        "save_summary",
+        lambda analysis_id, summary, status: saved.update({analysis_id: (status, summary)}),
+    )
+    monkeypatch.setattr(
+        analysis_worker,
+        "save_status",
+        lambda analysis_id, status: saved.update({analysis_id: (status, None)}),
+    )
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(celery_app.conf, "task_eager_propagates", True)
+    return saved
+
+
+def test_collect_project_files(project):
+    """Test le parcours du projet avec les motifs d'exclusion."""
+    assert collect_project_files(str(project)) == [
+        "src/broken.py",
+        "src/module_0.py",
+        "src/module_1.py",
+        "src/module_2.py",
+        "src/module_3.py",
+        "src/module_4.py",
+    ]
+
+
+def test_project_scan_fans_out_and_aggregates(project, worker):
+    """Test le découpage en lots et l'agrégation au dernier lot."""
+    assert submit_project_scan("analysis-1", str(project), chunk_size=2).get() == 3
+    status, summary = worker["analysis-1"]
+
+    assert summary["files_analyzed"] == 5
+    assert summary["files_failed"] == 1
+    assert summary["total_issues"] == 2
+    assert summary["severity_counts"]["medium"] == 2
+    assert summary["errors"] == [
+        {"file": "src/broken.py", "error": "syntax error while parsing AST from file"}
+    ]
+    assert status == "partial"
+
+    progress = get_scan_progress("analysis-1")
+    assert progress == {
+        "status": "partial",
+        "total": 6,
+        "done": 6,
+        "failed": 1,
+        "percent": 100.0,
+    }
+
+
+def test_empty_project(tmp_path, worker):
+    """Test un projet sans fichier analysable."""
+    assert submit_project_scan("analysis-2", str(tmp_path)).get() == 0
+    summary = worker["analysis-2"][1]
+    assert summary["files_analyzed"] == 0
+    assert summary["score"] == 100.0
+    assert get_scan_progress("analysis-2")["status"] == "completed"
+
+
+def test_all_files_failed(tmp_path, worker):
+    """Test le statut ``failed`` quand aucun fichier n'a pu être analysé."""
+    (tmp_path / "broken.py").write_text("def (:\n")
+    submit_project_scan("analysis-4", str(tmp_path))
+    status, summary = worker["analysis-4"]
+    assert summary["files_analyzed"] == 0
+    assert status == "failed"
+    assert get_scan_progress("analysis-4")["status"] == "failed"
+
+
+def test_batch_failure_marks_analysis_failed(project, worker, monkeypatch):
+    """Test l'errback qui clôture l'analyse si un lot lève une exception."""
+    monkeypatch.setattr(celery_app.conf, "task_eager_propagates", False)
+    monkeypatch.setattr(analysis_worker, "_coordinator", ScanCoordinator(capacity=2))
+    advanced = []
+
+    def advance(self, analysis_id, done, failed=0):
+        advanced.append(done)
+        if len(advanced) == 2:
+            raise ConnectionError("redis indisponible")
+
+    monkeypatch.setattr(AnalysisProgress, "advance", advance)
+    submit_project_scan("analysis-5", str(project), chunk_size=1)
+
+    # Les lots restants sont abandonnés et la capacité est libérée
+    assert advanced == [1, 1]
+    assert worker["analysis-5"] == ("failed", None)
+    assert get_scan_progress("analysis-5")["status"] == "failed"
+    coordinator = analysis_worker._coordinator
+    assert coordinator.jobs == {}
+    assert coordinator.dispatcher.in_flight == 0
+    assert coordinator.store.load() == []
+
+
+def test_batches_follow_fair_scheduler(tmp_path, worker, monkeypatch):
+    """Test que les lots sont publiés dans l'ordre de l'ordonnanceur, sur la file de leur voie."""
+    coordinator = ScanCoordinator(capacity=2)
+    monkeypatch.setattr(analysis_worker, "_coordinator", coordinator)
+    sent = []
+    monkeypatch.setattr(
+        analysis_worker.analyze_files,
+        "apply_async",
+        lambda args, queue, **options: sent.append((args[0], queue)),
+    )
+    for name in ("nightly", "pr"):
+        (tmp_path / name).mkdir()
+        for i in range(4):
+            (tmp_path / name / f"m{i}.py").write_text("x = 1\n")
+
+    submit_project_scan("nightly-1", str(tmp_path / "nightly"), chunk_size=1, lane="nightly")
+    submit_project_scan("pr-1", str(tmp_path / "pr"), chunk_size=1, lane="pr")
+    # Capacité atteinte par le scan nocturne : la PR attend un lot libéré
+    assert sent == [("nightly-1", "analysis.nightly")] * 2
+
+    coordinator.unit_done("nightly-1", 0, [])
+    coordinator.unit_done("nightly-1", 1, [])
+    assert sent[2:] == [("pr-1", "analysis.pr")] * 2
+
+
+def hold_batches(monkeypatch, coordinator):
+    """Intercepte la publication des lots ; retourne la liste ``(analysis_id, index, paths)``."""
+    sent = []
+    monkeypatch.setattr(analysis_worker, "_coordinator", coordinator)
+    monkeypatch.setattr(
+        analysis_worker.analyze_files,
+        "apply_async",
+        lambda args, queue, link, **options: sent.append((args[0], link.args[1], args[2])),
+    )
+    return sent
+
+
+def test_dispatcher_restart_resumes_scan(project, worker, monkeypatch):
+    """Test la reprise d'une analyse en cours après redémarrage du répartiteur."""
+    sent = hold_batches(monkeypatch, ScanCoordinator(capacity=2))
+    submit_project_scan("analysis-6", str(project), chunk_size=2)
+    analysis_id, index, paths = sent[0]
+    analysis_worker._coordinator.unit_done(analysis_id, index, [{"file": p, "summary": {}} for p in paths])
+    assert len(sent) == 3
+
+    # Nouveau processus : l'état est relu depuis Redis
+    restarted = ScanCoordinator(capacity=2)
+    sent.clear()
+    assert restarted.restore() == 1
+    assert sent == []
+    assert restarted.dispatcher.in_flight == 2
+    assert restarted.scheduler.pending() == 0
+
+    for index in (1, 2):
+        restarted.unit_done("analysis-6", index, [{"file": f"f{index}", "summary": {}}])
+    # Callback rejoué par le broker : déjà compté
+    restarted.unit_done("analysis-6", 2, [{"file": "f2", "summary": {}}])
+
+    status, summary = worker["analysis-6"]
+    assert status == "completed"
+    assert summary["files_analyzed"] == 4
+    assert restarted.jobs == {}
+    assert restarted.store.load() == []
+
+
+def test_duplicate_submission_is_ignored(project, worker, monkeypatch):
+    """Test qu'une tâche enqueue_scan rejouée ne remplace pas l'analyse en cours."""
+    coordinator = ScanCoordinator(capacity=1)
+    sent = hold_batches(monkeypatch, coordinator)
+    batches = [["src/module_0.py"], ["src/module_1.py"]]
+
+    assert coordinator.submit("analysis-7", "p", "manual", str(project), batches)
+    assert not coordinator.submit("analysis-7", "p", "manual", str(project), batches)
+    assert len(sent) == 1
+    assert coordinator.scheduler.pending() == 1
+
+
+def test_stalled_scan_is_reaped(project, worker, monkeypatch):
+    """Test la clôture en échec d'une analyse dont les lots en vol n'avancent plus."""
+    coordinator = ScanCoordinator(capacity=2)
+    sent = hold_batches(monkeypatch, coordinator)
+    coordinator.submit("analysis-8", "p", "manual", str(project), [["a.py"], ["b.py"], ["c.py"]])
+    assert coordinator.reap_stalled(timeout=3600) == []
+
+    monkeypatch.setattr(analysis_worker.time, "time", lambda: 10 ** 12)
+    assert coordinator.reap_stalled(timeout=3600) == ["analysis-8"]
+    assert worker["analysis-8"] == ("failed", None)
+    assert coordinator.dispatcher.in_flight == 0
+    assert coordinator.store.load() == []
+
+    # Fin tardive d'un lot abandonné
+    coordinator.unit_done("analysis-8", 0, [])
+    assert len(sent) == 2
+
+
+def test_project_walk_runs_on_lane_queue(project, worker, monkeypatch):
+    """Test que le parcours du projet est publié sur la file de la voie, pas sur le répartiteur."""
+    published = []
+    monkeypatch.setattr(
+        analysis_worker.plan_scan, "apply_async", lambda args, queue: published.append(queue)
+    )
+    submit_project_scan("analysis-9", str(project), lane="pr")
+    assert published == ["analysis.pr"]
+
+
+def test_merge_summaries():
+    """Test la fusion des résumés par fichier."""
+    summary = merge_summaries([
+        {"file": "a.py", "summary": {"score": 80.0, "total_issues": 2,
+                                     "severity_counts": {"high": 1, "low": 1}}},
+        {"file": "b.py", "summary": {"score": 100.0, "total_issues": 0,
+                                     "severity_counts": {}}},
+    ])
+    assert summary["score"] == 90.0
+    assert summary["min_score"] == 80.0
+    assert summary["severity_counts"] == {"critical": 0, "high": 1, "medium": 0, "low": 1}
+
+
+def test_progress_percent():
+    """Test le calcul du pourcentage d'avancement."""
+    progress = AnalysisProgress(FakeRedis())
+    progress.start("analysis-3", 4)
+    progress.advance("analysis-3", 1)
+    assert progress.get("analysis-3")["percent"] == 25.0
+    assert progress.get("unknown") == {}
+
+
+def test_partition_maintenance_is_scheduled(monkeypatch):
+    """Test la création planifiée des partitions mensuelles à venir."""
+    executed = []
+
+    class FakeConnection:
+        def execute(self, query, params):
+            executed.append(params["months"])
+            return MagicMock(scalar_one=lambda: f"partition_{params['months']}")
+
+    engine = MagicMock()
+    engine.begin.return_value.__enter__.return_value = FakeConnection()
+    monkeypatch.setattr(analysis_worker, "get_engine", lambda: engine)
+
+    assert create_result_partitions(2) == ["partition_0", "partition_1", "partition_2"]
+    assert executed == [0, 1, 2]
+    schedule = celery_app.conf.beat_schedule["create-result-partitions"]
+    assert schedule["task"] == create_result_partitions.name
@@ -0,0 +1,116 @@
+"""Tests pour l'écriture en masse des résultats d'analyse."""
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+from app.db.results_writer import RESULT_COLUMNS, AnalysisResultsWriter
+
+
+class FakeConnection:
+    """Connexion asyncpg simulée qui enregistre les lots reçus."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def copy_records_to_table(self, table, records, columns):
+        await self.pool.record("copy", table, records, columns)
+
+    async def executemany(self, query, records):
+        await self.pool.record("executemany", query, records, None)
+
+
+class FakePool:
+    """Pool simulé avec une latence d'écriture configurable."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def record(self, method, target, records, columns):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("écriture impossible")
+            self.calls.append((method, target, list(records), columns))
+        finally:
+            self.in_flight -= 1
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self)
+
+
+def make_finding(i):
+    return {
+        "analyzer_name": "bandit",
+        "severity": "HIGH",
+        "file_path": f"src/module_{i}.py",
+        "line_number": i,
+        "message": "Possible injection",
+        "rule_id": "B608",
+    }
+
+
+async def test_batches_are_copied():
+    """Test l'envoi par lots via COPY."""
+    pool = FakePool()
+    analysis_id = uuid4()
+    async with AnalysisResultsWriter(pool, analysis_id, batch_size=10) as writer:
+        await writer.write_many(make_finding(i) for i in range(25))
+
+    assert [len(call[2]) for call in pool.calls] == [10, 10, 5]
+    assert all(call[0] == "copy" for call in pool.calls)
+    assert pool.calls[0][1] == "analysis_results"
+    assert pool.calls[0][3] == RESULT_COLUMNS
+    assert pool.calls[0][2][0][0] == analysis_id
+    assert writer.rows_written == 25
+    assert writer.batches_written == 3
+
+
+async def test_executemany_fallback():
+    """Test le repli sur executemany."""
+    pool = FakePool()
+    async with AnalysisResultsWriter(
+        pool, uuid4(), batch_size=10, use_copy=False
+    ) as writer:
+        await writer.write_many(make_finding(i) for i in range(3))
+
+    assert len(pool.calls) == 1
+    method, query, records, _ = pool.calls[0]
+    assert method == "executemany"
+    assert query.startswith("INSERT INTO analysis_results")
+    assert len(records[0]) == len(RESULT_COLUMNS)
+
+
+async def test_back_pressure_bounds_pending_batches():
+    """Test que le nombre de lots en cours reste borné."""
+    pool = FakePool(delay=0.01)
+    async with AnalysisResultsWriter(
+        pool, uuid4(), batch_size=2, max_pending_batches=2
+    ) as writer:
+        await writer.write_many(make_finding(i) for i in range(40))
+
+    assert pool.max_in_flight <= 2
+    assert writer.rows_written == 40
+
+
+async def test_write_error_is_raised():
+    """Test la remontée des erreurs d'écriture."""
+    pool = FakePool(fail=True)
+    writer = AnalysisResultsWriter(pool, uuid4(), batch_size=1)
+    await writer.write(make_finding(1))
+    with pytest.raises(RuntimeError):
+        await writer.flush()
+
+
+def test_invalid_batch_size():
+    """Test la validation de la taille de lot."""
+    with pytest.raises(ValueError):
+        AnalysisResultsWriter(FakePool(), uuid4(), batch_size=0)
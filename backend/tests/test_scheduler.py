@@ -0,0 +1,240 @@
+"""Tests pour l'ordonnanceur équitable des analyses."""
+import pytest
+
+from app.workers.scheduler import (
+    AuditJob,
+    FairScheduler,
+    ScanDispatcher,
+    WorkUnit,
+    llm_units,
+    load_llm_task_priorities,
+)
+
+
+def make_job(analysis_id, project_id, count, lane="pr"):
+    units = [WorkUnit(name=f"{analysis_id}-{i}") for i in range(count)]
+    return AuditJob(analysis_id, project_id, units, lane=lane)
+
+
+def drain(scheduler, limit=None):
+    """Exécute les unités une à une et retourne l'ordre de service."""
+    order = []
+    while limit is None or len(order) < limit:
+        scheduled = scheduler.next_unit()
+        if scheduled is None:
+            break
+        job, unit = scheduled
+        order.append(job.analysis_id)
+        scheduler.complete(job)
+    return order
+
+
+def test_small_pr_job_is_not_stuck_behind_monorepo_scan():
+    """Test qu'une vérification de PR passe devant un gros scan nocturne."""
+    scheduler = FairScheduler()
+    scheduler.submit(make_job("monorepo", "platform", 1000, lane="nightly"))
+    drain(scheduler, limit=10)
+
+    pr_job = make_job("pr-42", "payments", 3)
+    scheduler.submit(pr_job)
+    order = drain(scheduler, limit=4)
+
+    assert order.count("pr-42") == 3
+    assert pr_job.done
+
+
+def test_lane_weights_share_throughput():
+    """Test le partage pondéré entre voies sous charge continue."""
+    scheduler = FairScheduler(project_quota=100)
+    scheduler.submit(make_job("nightly", "a", 500, lane="nightly"))
+    scheduler.submit(make_job("pr", "b", 500, lane="pr"))
+
+    order = drain(scheduler, limit=90)
+    assert order.count("pr") == 80
+    assert order.count("nightly") == 10
+
+
+def test_projects_share_a_lane_fairly():
+    """Test l'alternance entre projets d'une même voie."""
+    scheduler = FairScheduler()
+    scheduler.submit(make_job("big", "a", 100))
+    scheduler.submit(make_job("small", "b", 5))
+    assert drain(scheduler, limit=10) == ["big", "small"] * 5
+
+
+def test_project_quota_limits_running_units():
+    """Test le quota strict d'unités en cours par projet."""
+    scheduler = FairScheduler(project_quota=2, work_conserving=False)
+    scheduler.submit(make_job("a1", "a", 10))
+    scheduler.submit(make_job("a2", "a", 10, lane="nightly"))
+
+    first = scheduler.next_unit()
+    second = scheduler.next_unit()
+    assert first and second
+    assert scheduler.next_unit() is None
+    assert scheduler.running("a") == 2
+
+    scheduler.complete(first[0])
+    assert scheduler.next_unit() is not None
+
+
+def test_quota_yields_to_other_projects_then_borrows_idle_capacity():
+    """Test que le quota laisse passer les autres projets sans laisser de worker inactif."""
+    scheduler = FairScheduler(project_quota=1)
+    scheduler.submit(make_job("big", "a", 10, lane="nightly"))
+    scheduler.submit(make_job("other", "b", 10, lane="nightly"))
+
+    running = [scheduler.next_unit() for _ in range(2)]
+    assert [job.analysis_id for job, _ in running] == ["big", "other"]
+
+    borrowed = scheduler.next_unit()
+    assert borrowed is not None
+    assert scheduler.running("a") + scheduler.running("b") == 3
+
+    scheduler.submit(make_job("pr", "c", 1))
+    assert scheduler.next_unit()[0].analysis_id == "pr"
+
+
+def test_idle_flow_does_not_bank_credit():
+    """Test qu'un flux revenu après une pause ne monopolise pas les workers."""
+    scheduler = FairScheduler()
+    scheduler.submit(make_job("steady", "a", 100))
+    drain(scheduler, limit=50)
+
+    scheduler.submit(make_job("late", "b", 20))
+    assert drain(scheduler, limit=6) == ["late", "steady"] * 3
+
+
+def test_unknown_lane_is_rejected():
+    """Test le refus d'une voie inconnue."""
+    with pytest.raises(ValueError):
+        make_job("x", "a", 1, lane="urgent")
+
+
+def test_llm_units_follow_token_management_priorities(tmp_path):
+    """Test l'ordre des tâches LLM selon token_management.yaml."""
+    config = tmp_path / "token_management.yaml"
+    config.write_text(
+        "token_management:\n"
+        "  analysis_tasks:\n"
+        "    - name: basic_analysis\n"
+        "      priority: 1\n"
+        "    - name: security_analysis\n"
+        "      priority: 2\n"
+        "    - name: documentation_analysis\n"
+        "      priority: 4\n"
+    )
+    priorities = load_llm_task_priorities(config)
+    units = llm_units(
+        [
+            ("documentation_analysis", {"max_tokens": 8000}),
+            ("unknown_task", {}),
+            ("security_analysis", {"max_tokens": 20000}),
+            ("basic_analysis", {}),
+        ],
+        priorities,
+    )
+    assert units[0].cost == 8.0
+
+    scheduler = FairScheduler()
+    scheduler.submit(AuditJob("llm", "a", units))
+    served = []
+    while (scheduled := scheduler.next_unit()) is not None:
+        served.append(scheduled[1].name)
+        scheduler.complete(scheduled[0])
+    assert served == ["basic_analysis", "security_analysis", "documentation_analysis", "unknown_task"]
+
+
+def test_repository_config_priorities():
+    """Test la lecture de la configuration livrée avec le projet."""
+    priorities = load_llm_task_priorities()
+    assert priorities["basic_analysis"] < priorities["security_analysis"]
+
+
+def test_dispatcher_respects_capacity():
+    """Test la publication bornée par la capacité des workers."""
+    sent = []
+    scheduler = FairScheduler(project_quota=10)
+    dispatcher = ScanDispatcher(scheduler, lambda job, unit: sent.append((job, unit)), capacity=3)
+    scheduler.submit(make_job("a1", "a", 5))
+
+    assert dispatcher.fill() == 3
+    assert dispatcher.fill() == 0
+    assert dispatcher.unit_done(sent[0][0]) == 1
+    assert len(sent) == 4
+
+
+def test_dispatcher_requeues_unit_when_publish_fails():
+    """Test qu'une unité non publiée est remise en file sans consommer de capacité."""
+    scheduler = FairScheduler()
+    job = make_job("a1", "a", 2)
+    scheduler.submit(job)
+
+    def send(job, unit):
+        raise ConnectionError("broker indisponible")
+
+    dispatcher = ScanDispatcher(scheduler, send, capacity=2)
+    with pytest.raises(ConnectionError):
+        dispatcher.fill()
+
+    assert dispatcher.in_flight == 0
+    assert job.running == 0
+    assert drain(scheduler) == ["a1", "a1"]
+
+
+def test_dispatcher_completion_during_send():
+    """Test une unité terminée pendant sa publication (exécution eager)."""
+    scheduler = FairScheduler()
+    job = make_job("a1", "a", 3)
+    scheduler.submit(job)
+    sent = []
+
+    def send(job, unit):
+        sent.append(unit.name)
+        dispatcher.unit_done(job)
+
+    dispatcher = ScanDispatcher(scheduler, send, capacity=1)
+    assert dispatcher.fill() == 3
+    assert sent == ["a1-0", "a1-1", "a1-2"]
+    assert dispatcher.in_flight == 0
+    assert job.done
+
+
+def test_cancel_drops_pending_units():
+    """Test l'abandon des unités en attente d'une analyse."""
+    scheduler = FairScheduler()
+    job = make_job("a1", "a", 3)
+    scheduler.submit(job)
+    scheduler.submit(make_job("b1", "b", 1))
+    scheduler.next_unit()
+
+    assert scheduler.cancel(job) == 2
+    assert drain(scheduler) == ["b1"]
+
+
+def test_restored_running_units_count_toward_quota():
+    """Test qu'une analyse reprise avec des unités en vol consomme son quota."""
+    scheduler = FairScheduler(project_quota=2, work_conserving=False)
+    job = make_job("a1", "a", 3)
+    job.running = 2
+    scheduler.submit(job)
+
+    assert scheduler.next_unit() is None
+    scheduler.complete(job)
+    assert scheduler.next_unit()[0] is job
+
+
+def test_dispatcher_release_frees_capacity():
+    """Test l'abandon d'une analyse dont les unités en vol ne reviendront pas."""
+    sent = []
+    scheduler = FairScheduler(project_quota=10)
+    dispatcher = ScanDispatcher(scheduler, lambda job, unit: sent.append(job.analysis_id), capacity=2)
+    stuck = make_job("a1", "a", 4)
+    scheduler.submit(stuck)
+    dispatcher.fill()
+    scheduler.submit(make_job("b1", "b", 2))
+
+    assert dispatcher.release(stuck) == 2
+    assert sent == ["a1", "a1", "b1", "b1"]
+    assert dispatcher.in_flight == 2
+    assert scheduler.running("a") == 0
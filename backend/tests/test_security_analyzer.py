@@ -0,0 +1,42 @@
+"""Tests pour l'analyseur bandit + radon."""
+from app.analyzers.security_analyzer import MAX_COMPLEXITY, SecurityAnalyzer
+
+
+def test_clean_code_scores_100():
+    """Test un code sans problème."""
+    results = SecurityAnalyzer().analyze("print('Hello')\n", "simple.py")
+    assert results["security_issues"] == []
+    assert results["summary"] == {
+        "score": 100.0,
+        "total_issues": 0,
+        "severity_counts": {"critical": 0, "high": 0, "medium": 0, "low": 0},
+    }
+
+
+def test_security_issues_are_reported():
+    """Test la remontée des problèmes détectés par bandit."""
+    code = "import hashlib\nhashlib.md5(b'x')\n"
+    results = SecurityAnalyzer().analyze(code, "hashes.py")
+    issue = results["security_issues"][0]
+    assert issue["test_id"] == "B324"
+    assert issue["line_number"] == 2
+    assert results["summary"]["severity_counts"]["high"] == 1
+    assert results["summary"]["score"] == 90.0
+
+
+def test_complexity_penalty():
+    """Test la pénalité des fonctions trop complexes."""
+    branches = "".join(f"    if x == {i}:\n        return {i}\n" for i in range(MAX_COMPLEXITY + 2))
+    results = SecurityAnalyzer().analyze(f"def f(x):\n{branches}    return -1\n", "complex.py")
+    assert results["code_quality"]["complexity"] == MAX_COMPLEXITY + 3
+    assert results["summary"]["score"] == 94.0
+
+
+def test_batch_with_syntax_error(tmp_path):
+    """Test l'analyse d'un lot contenant un fichier invalide."""
+    (tmp_path / "ok.py").write_text("x = 1\n")
+    (tmp_path / "broken.py").write_text("def (:\n")
+    results = SecurityAnalyzer().analyze_paths(str(tmp_path), ["ok.py", "broken.py", "missing.py"])
+    assert results["ok.py"]["summary"]["score"] == 100.0
+    assert "error" in results["broken.py"]
+    assert "error" in results["missing.py"]
@@ -38,9 +38,9 @@ CREATE TABLE IF NOT EXISTS analyses (
     created_by UUID REFERENCES users(id)
 );
 
--- Table des résultats d'analyse détaillés
+-- Table des résultats d'analyse détaillés, partitionnée par mois sur created_at
 CREATE TABLE IF NOT EXISTS analysis_results (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     analysis_id UUID REFERENCES analyses(id) ON DELETE CASCADE,
     analyzer_name VARCHAR(100) NOT NULL,
     severity VARCHAR(50) NOT NULL,
@@ -50,7 +50,20 @@ CREATE TABLE IF NOT EXISTS analysis_results (
     message TEXT NOT NULL,
     code_snippet TEXT,
     rule_id VARCHAR(100),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Partition par défaut pour les lignes hors des partitions mensuelles
+CREATE TABLE IF NOT EXISTS analysis_results_default
+    PARTITION OF analysis_results DEFAULT;
+
+-- Agrégat des sévérités par analyse, maintenu par trigger
+CREATE TABLE IF NOT EXISTS analysis_severity_counts (
+    analysis_id UUID REFERENCES analyses(id) ON DELETE CASCADE,
+    severity VARCHAR(50) NOT NULL,
+    result_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (analysis_id, severity)
 );
 
 -- Table des métriques
@@ -104,7 +117,16 @@ CREATE TABLE IF NOT EXISTS api_tokens (
 
 -- Index pour améliorer les performances
 CREATE INDEX IF NOT EXISTS idx_analyses_project_id ON analyses(project_id);
-CREATE INDEX IF NOT EXISTS idx_analysis_results_analysis_id ON analysis_results(analysis_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_analysis_id
+    ON analysis_results(analysis_id, severity) INCLUDE (rule_id, file_path, line_number);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_severity
+    ON analysis_results(severity, created_at DESC) INCLUDE (analysis_id, rule_id, file_path);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_rule_id
+    ON analysis_results(rule_id, created_at DESC) INCLUDE (analysis_id, severity, file_path);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_file_path
+    ON analysis_results(file_path, created_at DESC) INCLUDE (analysis_id, severity, rule_id, line_number);
+CREATE INDEX IF NOT EXISTS idx_analysis_results_created_at_brin
+    ON analysis_results USING BRIN (created_at);
 CREATE INDEX IF NOT EXISTS idx_metrics_analysis_id ON metrics(analysis_id);
 CREATE INDEX IF NOT EXISTS idx_reports_analysis_id ON reports(analysis_id);
 CREATE INDEX IF NOT EXISTS idx_analyzer_configs_project_id ON analyzer_configs(project_id);
@@ -120,6 +142,75 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
+-- Fonction pour créer la partition mensuelle de analysis_results contenant une date.
+-- Les lignes du mois déjà présentes dans la partition par défaut y sont déplacées
+-- avant le rattachement, qui échouerait sinon.
+CREATE OR REPLACE FUNCTION create_analysis_results_partition(target_date DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_date DATE := date_trunc('month', target_date)::DATE;
+    end_date DATE := (date_trunc('month', target_date) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'analysis_results_' || to_char(target_date, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- Bloque les écritures dans la partition par défaut jusqu'au rattachement
+    LOCK TABLE analysis_results_default IN EXCLUSIVE MODE;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE analysis_results INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    -- Le déplacement vise directement les partitions : les triggers d'agrégat,
+    -- définis sur la table mère, ne sont pas déclenchés et les compteurs restent justes
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM analysis_results_default
+            WHERE created_at >= %L AND created_at < %L
+            RETURNING *
+        )
+        INSERT INTO %I SELECT * FROM moved',
+        start_date, end_date, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE analysis_results ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+-- Fonction pour maintenir analysis_severity_counts à partir des lignes modifiées
+CREATE OR REPLACE FUNCTION update_analysis_severity_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE analysis_severity_counts AS c
+        SET result_count = c.result_count - d.removed
+        FROM (
+            SELECT analysis_id, severity, COUNT(*) AS removed
+            FROM old_rows
+            GROUP BY analysis_id, severity
+        ) AS d
+        WHERE c.analysis_id = d.analysis_id AND c.severity = d.severity;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO analysis_severity_counts (analysis_id, severity, result_count)
+        SELECT analysis_id, severity, COUNT(*)
+        FROM new_rows
+        WHERE analysis_id IS NOT NULL
+        GROUP BY analysis_id, severity
+        ON CONFLICT (analysis_id, severity)
+        DO UPDATE SET result_count = analysis_severity_counts.result_count + EXCLUDED.result_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
 -- Triggers pour mettre à jour automatiquement updated_at
 CREATE TRIGGER update_users_updated_at
     BEFORE UPDATE ON users
@@ -140,3 +231,26 @@ CREATE TRIGGER update_analyzer_configs_updated_at
     BEFORE UPDATE ON analyzer_configs
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+-- Triggers pour maintenir les agrégats de sévérité (un déclenchement par instruction, COPY inclus)
+CREATE TRIGGER analysis_results_severity_counts_insert
+    AFTER INSERT ON analysis_results
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+CREATE TRIGGER analysis_results_severity_counts_update
+    AFTER UPDATE ON analysis_results
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+CREATE TRIGGER analysis_results_severity_counts_delete
+    AFTER DELETE ON analysis_results
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+-- Partitions mensuelles initiales de analysis_results
+SELECT create_analysis_results_partition((CURRENT_DATE + make_interval(months => m))::DATE)
+FROM generate_series(0, 2) AS m;
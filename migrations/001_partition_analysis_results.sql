@@ -0,0 +1,139 @@
+-- Migration : partitionnement de analysis_results et agrégats de sévérité
+--
+-- À appliquer une seule fois sur une base créée avec une version antérieure
+-- de init.sql. Les nouvelles installations obtiennent directement ce schéma.
+--
+--     psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f migrations/001_partition_analysis_results.sql
+--
+-- La table existante est recopiée dans une table partitionnée par mois sur
+-- created_at : prévoir une fenêtre de maintenance sur les grosses bases.
+
+BEGIN;
+
+ALTER TABLE analysis_results RENAME TO analysis_results_legacy;
+DROP INDEX IF EXISTS idx_analysis_results_analysis_id;
+
+-- Table des résultats d'analyse détaillés, partitionnée par mois sur created_at
+CREATE TABLE analysis_results (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    analysis_id UUID REFERENCES analyses(id) ON DELETE CASCADE,
+    analyzer_name VARCHAR(100) NOT NULL,
+    severity VARCHAR(50) NOT NULL,
+    file_path TEXT NOT NULL,
+    line_number INTEGER,
+    column_number INTEGER,
+    message TEXT NOT NULL,
+    code_snippet TEXT,
+    rule_id VARCHAR(100),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE analysis_results_default
+    PARTITION OF analysis_results DEFAULT;
+
+-- Agrégat des sévérités par analyse, maintenu par trigger
+CREATE TABLE IF NOT EXISTS analysis_severity_counts (
+    analysis_id UUID REFERENCES analyses(id) ON DELETE CASCADE,
+    severity VARCHAR(50) NOT NULL,
+    result_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (analysis_id, severity)
+);
+
+CREATE OR REPLACE FUNCTION create_analysis_results_partition(target_date DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_date DATE := date_trunc('month', target_date)::DATE;
+    end_date DATE := (date_trunc('month', target_date) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'analysis_results_' || to_char(target_date, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF analysis_results FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION update_analysis_severity_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE analysis_severity_counts AS c
+        SET result_count = c.result_count - d.removed
+        FROM (
+            SELECT analysis_id, severity, COUNT(*) AS removed
+            FROM old_rows
+            GROUP BY analysis_id, severity
+        ) AS d
+        WHERE c.analysis_id = d.analysis_id AND c.severity = d.severity;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO analysis_severity_counts (analysis_id, severity, result_count)
+        SELECT analysis_id, severity, COUNT(*)
+        FROM new_rows
+        WHERE analysis_id IS NOT NULL
+        GROUP BY analysis_id, severity
+        ON CONFLICT (analysis_id, severity)
+        DO UPDATE SET result_count = analysis_severity_counts.result_count + EXCLUDED.result_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER analysis_results_severity_counts_insert
+    AFTER INSERT ON analysis_results
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+CREATE TRIGGER analysis_results_severity_counts_update
+    AFTER UPDATE ON analysis_results
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+CREATE TRIGGER analysis_results_severity_counts_delete
+    AFTER DELETE ON analysis_results
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_analysis_severity_counts();
+
+-- Partitions mensuelles couvrant les données existantes et les mois à venir
+SELECT create_analysis_results_partition(month::DATE)
+FROM generate_series(
+    date_trunc('month', COALESCE(
+        (SELECT MIN(created_at) FROM analysis_results_legacy),
+        CURRENT_TIMESTAMP
+    )),
+    date_trunc('month', CURRENT_TIMESTAMP) + INTERVAL '2 months',
+    INTERVAL '1 month'
+) AS month;
+
+-- Recopie des résultats ; le trigger d'insertion alimente analysis_severity_counts
+INSERT INTO analysis_results (
+    id, analysis_id, analyzer_name, severity, file_path, line_number,
+    column_number, message, code_snippet, rule_id, created_at
+)
+SELECT
+    id, analysis_id, analyzer_name, severity, file_path, line_number,
+    column_number, message, code_snippet, rule_id,
+    COALESCE(created_at, CURRENT_TIMESTAMP)
+FROM analysis_results_legacy;
+
+DROP TABLE analysis_results_legacy;
+
+CREATE INDEX idx_analysis_results_analysis_id
+    ON analysis_results(analysis_id, severity) INCLUDE (rule_id, file_path, line_number);
+CREATE INDEX idx_analysis_results_severity
+    ON analysis_results(severity, created_at DESC) INCLUDE (analysis_id, rule_id, file_path);
+CREATE INDEX idx_analysis_results_rule_id
+    ON analysis_results(rule_id, created_at DESC) INCLUDE (analysis_id, severity, file_path);
+CREATE INDEX idx_analysis_results_file_path
+    ON analysis_results(file_path, created_at DESC) INCLUDE (analysis_id, severity, rule_id, line_number);
+CREATE INDEX idx_analysis_results_created_at_brin
+    ON analysis_results USING BRIN (created_at);
+
+COMMIT;
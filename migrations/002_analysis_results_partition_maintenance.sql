@@ -0,0 +1,65 @@
+-- Migration : maintenance des partitions mensuelles de analysis_results
+--
+-- À appliquer sur une base ayant reçu 001_partition_analysis_results.sql.
+--
+--     psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f migrations/002_analysis_results_partition_maintenance.sql
+--
+-- create_analysis_results_partition déplace désormais les lignes du mois
+-- depuis la partition par défaut avant de rattacher la nouvelle partition.
+-- La tâche Celery beat maintenance.create_result_partitions l'appelle chaque
+-- jour pour les mois à venir.
+
+BEGIN;
+
+-- Fonction pour créer la partition mensuelle de analysis_results contenant une date.
+-- Les lignes du mois déjà présentes dans la partition par défaut y sont déplacées
+-- avant le rattachement, qui échouerait sinon.
+CREATE OR REPLACE FUNCTION create_analysis_results_partition(target_date DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_date DATE := date_trunc('month', target_date)::DATE;
+    end_date DATE := (date_trunc('month', target_date) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'analysis_results_' || to_char(target_date, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- Bloque les écritures dans la partition par défaut jusqu'au rattachement
+    LOCK TABLE analysis_results_default IN EXCLUSIVE MODE;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE analysis_results INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    -- Le déplacement vise directement les partitions : les triggers d'agrégat,
+    -- définis sur la table mère, ne sont pas déclenchés et les compteurs restent justes
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM analysis_results_default
+            WHERE created_at >= %L AND created_at < %L
+            RETURNING *
+        )
+        INSERT INTO %I SELECT * FROM moved',
+        start_date, end_date, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE analysis_results ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+-- Rattrape les mois écoulés depuis la dernière création de partition
+SELECT create_analysis_results_partition(month::DATE)
+FROM generate_series(
+    date_trunc('month', COALESCE(
+        (SELECT MIN(created_at) FROM analysis_results_default),
+        CURRENT_TIMESTAMP
+    )),
+    date_trunc('month', CURRENT_TIMESTAMP) + INTERVAL '2 months',
+    INTERVAL '1 month'
+) AS month;
+
+COMMIT;
@@ -0,0 +1,97 @@
+"""Benchmark de la latence de connexion sous charge concurrente.
+
+Compare la vérification bcrypt exécutée directement dans la boucle
+d'événements et la vérification déléguée au pool borné de
+``auth.hashing.PasswordHasher``. Pour chaque mode, le script mesure la
+latence des connexions (p50/p99) et le retard subi par une requête
+légère exécutée en parallèle.
+
+Usage :
+    python scripts/benchmark_auth_hashing.py --logins 200 --rounds 12
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auth.hashing import PasswordHasher, make_password_context  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Retourne le percentile ``pct`` d'une liste de durées."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    """Simule une requête légère toutes les 10 ms et relève son retard."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def run_logins(
+    verify: Callable[[], Awaitable[bool]], logins: int
+) -> Dict[str, List[float]]:
+    latencies: List[float] = []
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    async def login() -> None:
+        await verify()
+        latencies.append(time.perf_counter() - burst_start)
+
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+    await asyncio.sleep(0)
+    # Toutes les connexions arrivent au même instant
+    burst_start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    stop.set()
+    await ticker
+    return {"latencies": latencies, "lags": lags or [0.0]}
+
+
+def report(name: str, results: Dict[str, List[float]]) -> None:
+    latencies = results["latencies"]
+    lags = results["lags"]
+    print(
+        f"{name:<10} connexion p50 {statistics.median(latencies) * 1000:8.1f} ms"
+        f"  p99 {percentile(latencies, 99) * 1000:8.1f} ms"
+        f"  | requête légère p99 {percentile(lags, 99) * 1000:8.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    context = make_password_context(args.rounds)
+    hashed = context.hash("benchmark-password")
+
+    async def verify_inline() -> bool:
+        return context.verify("benchmark-password", hashed)
+
+    hasher = PasswordHasher(context, max_workers=args.workers, max_queue=args.logins)
+
+    async def verify_pooled() -> bool:
+        return await hasher.verify("benchmark-password", hashed)
+
+    print(f"{args.logins} connexions simultanées, bcrypt rounds={args.rounds}")
+    report("bloquant", await run_logins(verify_inline, args.logins))
+    report("pool", await run_logins(verify_pooled, args.logins))
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
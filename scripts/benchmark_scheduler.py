@@ -0,0 +1,146 @@
+"""Simulation de la latence des petites analyses sous charge mixte.
+
+Des scans nocturnes de monorepo (plusieurs milliers de lots) sont en
+file quand des vérifications de PR de quelques lots arrivent en continu.
+La simulation à événements discrets compare une file FIFO unique, telle
+que la fournit le broker, à ``app.workers.scheduler.FairScheduler`` et
+relève la latence de bout en bout des PR (p50/p95/p99), la fin des scans
+nocturnes, la fin de toutes les analyses et l'occupation des workers.
+
+Usage :
+    python scripts/benchmark_scheduler.py --workers 16 --nightly-units 3000
+"""
+
+import argparse
+import heapq
+import itertools
+import random
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.workers.scheduler import DEFAULT_PROJECT_QUOTA, AuditJob, FairScheduler, WorkUnit  # noqa: E402
+
+
+class FifoScheduler:
+    """Référence : les lots sont servis dans leur ordre de publication."""
+
+    def __init__(self):
+        self._queue = deque()
+
+    def submit(self, job: AuditJob) -> None:
+        while job.pending:
+            self._queue.append((job, job.pop_unit()))
+
+    def next_unit(self) -> Optional[Tuple[AuditJob, WorkUnit]]:
+        if not self._queue:
+            return None
+        job, unit = self._queue.popleft()
+        job.running += 1
+        return job, unit
+
+    def complete(self, job: AuditJob) -> None:
+        job.running -= 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Retourne le percentile ``pct`` d'une liste de durées."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def build_workload(args, rng: random.Random) -> List[Tuple[float, AuditJob]]:
+    """Génère les arrivées : scans nocturnes à t=0 puis PR en flux de Poisson."""
+    arrivals = []
+    for i in range(args.nightly_scans):
+        units = [WorkUnit(cost=1.0) for _ in range(args.nightly_units)]
+        arrivals.append((0.0, AuditJob(f"nightly-{i}", f"monorepo-{i}", units, lane="nightly", submitted_at=0.0)))
+
+    now = 0.0
+    for i in range(args.pr_jobs):
+        now += rng.expovariate(args.pr_rate)
+        units = [WorkUnit(cost=1.0) for _ in range(rng.randint(1, args.pr_max_units))]
+        project = f"team-{rng.randrange(args.projects)}"
+        arrivals.append((now, AuditJob(f"pr-{i}", project, units, lane="pr", submitted_at=now)))
+    return arrivals
+
+
+def simulate(
+    scheduler, arrivals: List[Tuple[float, AuditJob]], workers: int, rng: random.Random
+) -> Tuple[Dict[str, float], float]:
+    """Exécute la simulation ; retourne la date de fin de chaque analyse et le temps de travail cumulé."""
+    seq = itertools.count()
+    events = [(at, next(seq), "submit", job) for at, job in arrivals]
+    heapq.heapify(events)
+    idle = workers
+    busy = 0.0
+    finished: Dict[str, float] = {}
+
+    while events:
+        now, _, kind, job = heapq.heappop(events)
+        if kind == "submit":
+            scheduler.submit(job)
+        else:
+            scheduler.complete(job)
+            idle += 1
+            if job.done:
+                finished[job.analysis_id] = now
+
+        while idle:
+            scheduled = scheduler.next_unit()
+            if scheduled is None:
+                break
+            job, unit = scheduled
+            idle -= 1
+            duration = unit.cost * rng.uniform(0.5, 1.5)
+            busy += duration
+            heapq.heappush(events, (now + duration, next(seq), "done", job))
+    return finished, busy
+
+
+def report(name: str, arrivals, finished: Dict[str, float], busy: float, workers: int) -> None:
+    latencies = [finished[job.analysis_id] - at for at, job in arrivals if job.lane == "pr"]
+    nightly_end = max(finished[job.analysis_id] for _, job in arrivals if job.lane == "nightly")
+    end = max(finished.values())
+    print(
+        f"{name:<12} PR p50={percentile(latencies, 50):7.1f}s  "
+        f"p95={percentile(latencies, 95):7.1f}s  p99={percentile(latencies, 99):7.1f}s  "
+        f"nocturnes={nightly_end:6.1f}s  tout={end:6.1f}s  "
+        f"occupation={100 * busy / (workers * end):5.1f}%"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--nightly-scans", type=int, default=3)
+    parser.add_argument("--nightly-units", type=int, default=3000)
+    parser.add_argument("--pr-jobs", type=int, default=500)
+    parser.add_argument("--pr-rate", type=float, default=1.0, help="arrivées de PR par seconde")
+    parser.add_argument("--pr-max-units", type=int, default=8)
+    parser.add_argument("--projects", type=int, default=30)
+    parser.add_argument("--quota", type=int, default=DEFAULT_PROJECT_QUOTA, help="lots en cours par projet")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(
+        f"{args.workers} workers, {args.nightly_scans} scans nocturnes de {args.nightly_units} lots, "
+        f"{args.pr_jobs} PR de 1 à {args.pr_max_units} lots ({args.pr_rate}/s)"
+    )
+    schedulers = (
+        ("fifo", FifoScheduler()),
+        ("fair", FairScheduler(project_quota=args.quota)),
+        ("fair strict", FairScheduler(project_quota=args.quota, work_conserving=False)),
+    )
+    for name, scheduler in schedulers:
+        arrivals = build_workload(args, random.Random(args.seed))
+        finished, busy = simulate(scheduler, arrivals, args.workers, random.Random(args.seed))
+        report(name, arrivals, finished, busy, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Tests pour le hachage des mots de passe hors de la boucle d'événements."""
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from auth.auth import AuthManager
+from auth.cache import PrincipalCache
+from auth.hashing import HashingBusyError, PasswordHasher, make_password_context
+
+FAST_ROUNDS = 4
+
+
+@pytest.fixture
+def hasher():
+    """Hacheur avec un coût bcrypt minimal pour des tests rapides."""
+    hasher = PasswordHasher(make_password_context(FAST_ROUNDS), max_workers=2, max_queue=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def make_auth_manager(hasher, password_hash):
+    """AuthManager sur une session simulée contenant un seul utilisateur."""
+    user = MagicMock(is_active=True, password_hash=password_hash)
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = user
+    return AuthManager(session, hasher=hasher, cache=PrincipalCache()), user, session
+
+
+def test_hash_and_verify(hasher):
+    """Test le hachage et la vérification sur le pool."""
+    async def scenario():
+        hashed = await hasher.hash("secret")
+        return (
+            await hasher.verify("secret", hashed),
+            await hasher.verify("wrong", hashed),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_queue_depth_is_bounded(hasher):
+    """Test le rejet des requêtes au-delà de la file d'attente."""
+    release = threading.Event()
+    futures = [hasher._submit(release.wait) for _ in range(4)]
+
+    with pytest.raises(HashingBusyError):
+        hasher._submit(release.wait)
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_rehash_on_login_when_cost_changes(hasher):
+    """Test la mise à jour du hash lorsque le coût bcrypt change."""
+    old_hash = make_password_context(FAST_ROUNDS + 1).hash("secret")
+    auth_manager, user, session = make_auth_manager(hasher, old_hash)
+
+    success, _, _ = auth_manager.authenticate_user("user@example.com", "secret")
+
+    assert success
+    assert user.password_hash != old_hash
+    assert hasher.context.verify("secret", user.password_hash)
+    assert not hasher.context.needs_update(user.password_hash)
+    session.commit.assert_called()
+
+
+def test_failed_rehash_keeps_login_successful(hasher):
+    """Test qu'un échec de l'écriture du nouveau hash ne refuse pas un bon mot de passe."""
+    old_hash = make_password_context(FAST_ROUNDS + 1).hash("secret")
+    auth_manager, user, session = make_auth_manager(hasher, old_hash)
+    session.commit.side_effect = RuntimeError("db down")
+
+    success, message, _ = auth_manager.authenticate_user("user@example.com", "secret")
+
+    assert success, message
+    session.rollback.assert_called_once()
+    assert auth_manager.cache.get_credentials("user@example.com", "secret") is not None
+
+
+def test_authenticate_user_async(hasher):
+    """Test l'authentification asynchrone."""
+    auth_manager, user, _ = make_auth_manager(hasher, hasher.context.hash("secret"))
+    stored_hash = user.password_hash
+
+    success, message, _ = asyncio.run(
+        auth_manager.authenticate_user_async("user@example.com", "secret")
+    )
+    assert success, message
+    assert user.password_hash == stored_hash
+
+    success, message, _ = asyncio.run(
+        auth_manager.authenticate_user_async("user@example.com", "wrong")
+    )
+    assert not success
+    assert message == "Incorrect password"
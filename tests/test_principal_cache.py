@@ -0,0 +1,198 @@
+"""Tests pour le cache des identités authentifiées."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from auth import DatabaseManager
+from auth.auth import AuthManager
+from auth.cache import LocalCacheBackend, PrincipalCache, RedisCacheBackend, TokenUsageTracker
+from auth.hashing import PasswordHasher, make_password_context
+from auth.models import ApiToken, User
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Base SQLite contenant un utilisateur et un token d'API."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'auth.db'}")
+    manager.init_db()
+    hasher = PasswordHasher(make_password_context(4))
+    user_id = uuid4()
+    with manager.session_scope() as session:
+        session.add(User(
+            id=user_id,
+            email="user@example.com",
+            first_name="Jane",
+            last_name="Doe",
+            password_hash=hasher.context.hash("secret"),
+            is_active=True,
+            is_admin=False,
+            created_at=NOW,
+            updated_at=NOW,
+        ))
+        session.add(ApiToken(
+            id=uuid4(), user_id=user_id, token="ci-token", created_at=NOW
+        ))
+        session.commit()
+    manager.user_id = user_id
+    manager.hasher = hasher
+    yield manager
+    hasher.shutdown()
+    manager.dispose()
+
+
+@pytest.fixture
+def statements(db_manager):
+    """Liste des requêtes SQL exécutées sur la base."""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(db_manager.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_manager.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def cache():
+    return PrincipalCache(ttl=60)
+
+
+def make_auth_manager(db_manager, cache, usage_tracker=None):
+    return AuthManager(
+        db_manager.SessionLocal(),
+        hasher=db_manager.hasher,
+        cache=cache,
+        usage_tracker=usage_tracker or TokenUsageTracker(),
+    )
+
+
+def test_cached_login_skips_database(db_manager, cache, statements):
+    """Test qu'une connexion répétée ne refait ni requête ni bcrypt."""
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        success, _, user = auth_manager.authenticate_user("user@example.com", "secret")
+        assert success and user.email == "user@example.com"
+    assert not any(s.startswith(("UPDATE", "COMMIT")) for s in statements)
+
+    statements.clear()
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        success, _, user = auth_manager.authenticate_user("user@example.com", "secret")
+        assert success
+        assert user.id == db_manager.user_id
+        assert user.is_admin is False
+    assert statements == []
+    assert cache.hits == 1
+
+
+def test_wrong_password_is_not_served_from_cache(db_manager, cache):
+    """Test qu'un mauvais mot de passe ne profite pas du cache."""
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        auth_manager.authenticate_user("user@example.com", "secret")
+        success, message, _ = auth_manager.authenticate_user("user@example.com", "wrong")
+    assert not success
+    assert message == "Incorrect password"
+
+
+def test_deactivation_invalidates_cache(db_manager, cache):
+    """Test l'invalidation explicite lors de la désactivation."""
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        auth_manager.authenticate_user("user@example.com", "secret")
+        auth_manager.deactivate_user(db_manager.user_id)
+
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        success, message, _ = auth_manager.authenticate_user("user@example.com", "secret")
+    assert not success
+    assert message == "User account is disabled"
+
+
+def test_token_lookup_is_cached_and_usage_batched(db_manager, cache, statements):
+    """Test le cache des tokens d'API et l'écriture groupée de last_used_at."""
+    tracker = TokenUsageTracker(flush_interval=3600)
+    for _ in range(5):
+        with make_auth_manager(db_manager, cache, tracker) as auth_manager:
+            success, _, user = auth_manager.authenticate_token("ci-token")
+            assert success and user.id == db_manager.user_id
+
+    assert sum(s.startswith("SELECT") for s in statements) == 2
+    assert not any(s.startswith("UPDATE") for s in statements)
+
+    assert tracker.flush(db_manager.engine) == 1
+    with db_manager.session_scope() as session:
+        assert session.query(ApiToken).one().last_used_at is not None
+
+
+def test_failed_usage_flush_keeps_token_valid(db_manager, cache, monkeypatch):
+    """Test qu'une erreur d'écriture de last_used_at ne refuse pas un token valide."""
+    tracker = TokenUsageTracker(flush_interval=0)
+    with make_auth_manager(db_manager, cache, tracker) as auth_manager:
+        assert auth_manager.authenticate_token("ci-token")[0]
+
+    def flush(bind):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(tracker, "flush", flush)
+    with make_auth_manager(db_manager, cache, tracker) as auth_manager:
+        success, message, user = auth_manager.authenticate_token("ci-token")
+    assert success, message
+    assert user.id == db_manager.user_id
+
+
+def test_unknown_and_expired_tokens(db_manager, cache):
+    """Test le refus des tokens inconnus ou expirés."""
+    with db_manager.session_scope() as session:
+        session.add(ApiToken(
+            id=uuid4(),
+            user_id=db_manager.user_id,
+            token="old-token",
+            expires_at=NOW - timedelta(days=1),
+            created_at=NOW,
+        ))
+        session.commit()
+
+    with make_auth_manager(db_manager, cache) as auth_manager:
+        assert auth_manager.authenticate_token("missing")[1] == "Invalid API token"
+        assert auth_manager.authenticate_token("old-token")[1] == "API token expired"
+
+
+def test_local_backend_lru_and_ttl():
+    """Test l'éviction LRU et l'expiration du cache local."""
+    backend = LocalCacheBackend(max_entries=2)
+    backend.set("a", {"id": "1"}, ttl=60)
+    backend.set("b", {"id": "2"}, ttl=60)
+    backend.get("a")
+    backend.set("c", {"id": "3"}, ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+
+    backend.set("d", {"id": "4"}, ttl=0)
+    assert backend.get("d") is None
+
+
+def test_redis_user_index_outlives_entries():
+    """Test que l'index par utilisateur survit aux entrées à durée de vie plus courte."""
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    cache = PrincipalCache(RedisCacheBackend(client), ttl=60)
+    principal = {"id": "user-1"}
+
+    cache.set_credentials("user@example.com", "secret", principal)
+    cache.set_token("ci-token", principal, expires_at=datetime.now(timezone.utc) + timedelta(seconds=5))
+
+    token_ttl = pipe.set.call_args_list[-1].kwargs["px"]
+    assert token_ttl <= 5000
+    assert [c.args[1] for c in pipe.pexpire.call_args_list] == [60000, 60000]
+
+
+def test_dispose_flushes_pending_token_usage(db_manager, cache):
+    """Test l'écriture des last_used_at en attente à l'arrêt."""
+    with make_auth_manager(db_manager, cache, db_manager.usage_tracker) as auth_manager:
+        assert auth_manager.authenticate_token("ci-token")[0]
+
+    db_manager.dispose()
+    with db_manager.session_scope() as session:
+        assert session.query(ApiToken).one().last_used_at is not None